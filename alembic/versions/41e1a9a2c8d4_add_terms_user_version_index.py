@@ -0,0 +1,40 @@
+"""add_terms_user_version_index
+
+Revision ID: 41e1a9a2c8d4
+Revises: f51d88681e18
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '41e1a9a2c8d4'
+down_revision: Union[str, None] = 'f51d88681e18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add a composite (user_id, terms_version) index to user_terms_acceptance."""
+    op.create_index('ix_terms_user_version', 'user_terms_acceptance', ['user_id', 'terms_version'], unique=False)
+
+
+def downgrade() -> None:
+    """Drop the composite (user_id, terms_version) index."""
+    # InnoDB needs an index starting with user_id for the foreign key. The
+    # index it created implicitly with the foreign key is silently dropped as
+    # soon as another index can serve the key, which the composite index does,
+    # and it then refuses to drop the composite index. Only in that case is a
+    # plain user_id index added before dropping it.
+    indexes = sa.inspect(op.get_bind()).get_indexes('user_terms_acceptance')
+    if not any(
+        index['column_names'][:1] == ['user_id']
+        for index in indexes
+        if index['name'] != 'ix_terms_user_version'
+    ):
+        op.create_index('ix_user_terms_acceptance_user_id', 'user_terms_acceptance', ['user_id'], unique=False)
+    op.drop_index('ix_terms_user_version', table_name='user_terms_acceptance')
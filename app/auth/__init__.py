@@ -2,13 +2,16 @@ import base64
 import json
 from fastapi import Request
 
-def get_user_from_request(request: Request):
-    encoded = request.headers.get("X-MS-CLIENT-PRINCIPAL")
+def get_user_from_principal(encoded):
+    """Decode an X-MS-CLIENT-PRINCIPAL header value (str or raw bytes)."""
     if not encoded:
         return None
     decoded = base64.b64decode(encoded).decode('utf-8')
     return json.loads(decoded)
 
+def get_user_from_request(request: Request):
+    return get_user_from_principal(request.headers.get("X-MS-CLIENT-PRINCIPAL"))
+
 # Import other modules to make them available when importing from app.auth
 from app.auth.jwt import *
 from app.auth.oauth import *
\ No newline at end of file
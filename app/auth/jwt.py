@@ -6,6 +6,7 @@ from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jose import JWTError, jwt
 from pydantic import BaseModel
 import os
+import time
 from sqlalchemy.orm import Session
 
 from app.users.crud import get_user_by_email
@@ -18,6 +19,13 @@ SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-secret-key-for-jwt-please-change-
 ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
 
+# Decoded token subjects, keyed by the raw token: token -> (email, expires_at).
+# Only the subject is cached, never the User row, so changes to the user are
+# still picked up on every request.
+TOKEN_CACHE_TTL = 60
+TOKEN_CACHE_MAXSIZE = 10_000
+_token_cache = {}
+
 # Create a custom OAuth2 scheme that will be skipped for OPTIONS requests
 class CustomOAuth2PasswordBearer(OAuth2PasswordBearer):
     async def __call__(self, request: Request):
@@ -82,6 +90,26 @@ def authenticate_user(db, email: str, password: str):
         return False
     return user
 
+def decode_token_subject(token: str) -> Optional[str]:
+    """Return the "sub" claim of a token, raising JWTError if it doesn't verify."""
+    now = time.monotonic()
+    cached = _token_cache.get(token)
+    if cached is not None and cached[1] > now:
+        return cached[0]
+
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    email = payload.get("sub")
+    if email is not None:
+        ttl = TOKEN_CACHE_TTL
+        exp = payload.get("exp")
+        if exp is not None:
+            # Never serve a cached subject past the token's own expiry
+            ttl = min(ttl, exp - time.time())
+        if len(_token_cache) >= TOKEN_CACHE_MAXSIZE:
+            _token_cache.pop(next(iter(_token_cache)))
+        _token_cache[token] = (email, now + ttl)
+    return email
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -104,8 +132,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
+        email: str = decode_token_subject(token)
         if email is None:
             raise credentials_exception
         token_data = TokenData(email=email)
@@ -113,6 +140,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
         raise credentials_exception
     user = get_user(db, email=token_data.email)
     if user is None:
+        _token_cache.pop(token, None)
         raise credentials_exception
     return user
 
@@ -144,8 +172,7 @@ async def get_current_user_optional(token: str = Depends(oauth2_scheme), db: Ses
         return None
         
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
+        email: str = decode_token_subject(token)
         if email is None:
             return None
         token_data = TokenData(email=email)
@@ -9,7 +9,7 @@ import secrets
 import time
 from urllib.parse import urlencode
 
-from app.users.crud import get_user_by_oauth, create_user, get_user_by_username
+from app.users.crud import get_user_by_oauth, create_user, get_user_by_username, auto_accept_terms_for_oauth_user
 from app.db import SessionLocal
 from app.auth.jwt import create_access_token
 from app.users.schemas import UserCreate
@@ -377,6 +377,8 @@ async def auth_via_google(request: Request):
                 else:
                     log.info(f"Found existing user: {user.username}")
                 
+                accept_terms_for_oauth_user(db, user, request)
+                
                 # If we got here, the database operation was successful
                 break
                 
@@ -750,6 +752,8 @@ async def auth_via_microsoft(request: Request):
                     else:
                         log.info(f"Found existing user: {user.username}")
                     
+                    accept_terms_for_oauth_user(db, user, request)
+                    
                     # If we got here, the database operation was successful
                     break
                     
@@ -955,6 +959,15 @@ async def check_environment_variables():
         "message": "Environment variables check"
     }
 
+# Helper function to record terms acceptance for OAuth sign-ins
+def accept_terms_for_oauth_user(db, user, request: Request):
+    """
+    Record terms of service acceptance for a user signing in through OAuth.
+    The request's client IP is stored with the acceptance, or 0.0.0.0 if unknown.
+    """
+    client_ip = request.client.host if request.client else "0.0.0.0"
+    auto_accept_terms_for_oauth_user(db, user.id, ip_address=client_ip)
+
 # Helper function to mask sensitive strings
 def mask_string(s, show_start=4, show_end=4):
     """Mask a string for safe display, showing only start and end characters"""
@@ -1161,6 +1174,8 @@ async def get_oauth_user(provider: str, request: Request):
                 log.info(f"Created new user: {username}")
             else:
                 log.info(f"Found existing user: {user.username}")
+            
+            accept_terms_for_oauth_user(db, user, request)
         finally:
             db.close()
         
@@ -39,8 +39,9 @@ engine = create_engine(
         "connect_timeout": 60,  # 60 seconds connection timeout
     },
     # Add pool settings
-    pool_size=10,  # Number of connections to keep open
-    max_overflow=20,  # Max number of connections to create when pool is full
+    # Pool limits can be lowered for single-process scripts sharing this engine
+    pool_size=int(os.getenv("DB_POOL_SIZE", "10")),  # Number of connections to keep open
+    max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "20")),  # Max number of connections to create when pool is full
     pool_timeout=30,  # Timeout for getting a connection from the pool
     pool_recycle=3600,  # Recycle connections after 1 hour to avoid stale connections
     pool_pre_ping=True  # Test connections with a ping before using them
@@ -66,12 +67,11 @@ def get_db():
 def init_db():
     """Initialize the database by creating all tables."""
     try:
-        # Create all tables defined in models
+        # Create all tables defined in models. This already checks out a pooled
+        # connection (validated by pool_pre_ping), so no separate SELECT 1 test
+        # is needed at startup.
         Base.metadata.create_all(bind=engine)
         print("Database tables created successfully")
-        
-        # Test connection
-        test_connection()
     except Exception as e:
         print(f"Error initializing database: {e}")
 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Boolean, Table, JSON, Float, Date
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Boolean, Table, JSON, Float, Date, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -346,6 +346,11 @@ class UserTermsAcceptance(Base):
     # Relationship to User
     user = relationship("User", backref="terms_acceptances")
     
+    __table_args__ = (
+        # Lookups are by user and terms version together
+        Index("ix_terms_user_version", "user_id", "terms_version"),
+    )
+    
     def __repr__(self):
         return f"<UserTermsAcceptance(user_id={self.user_id}, terms_version={self.terms_version}, signed_at={self.signed_at})>"
 
@@ -378,12 +378,18 @@ async def _run_structured_path_creation_task(
     db_session_factory: callable,
     user_id: int,
     structure_request: LearningPathStructureRequest,
-    timeout_seconds: int
+    timeout_seconds: int,
+    planner_service: Optional[LearningPathPlannerService] = None
 ):
-    """Task to save structure and generate cards."""
+    """Task to save structure and generate cards.
+
+    Callers running many paths can pass a shared planner_service so the
+    AI agents (and their pooled HTTP clients) are reused across tasks.
+    """
     start_time = time.time()
     db: Optional[Session] = None
-    planner_service = LearningPathPlannerService()
+    if planner_service is None:
+        planner_service = LearningPathPlannerService()
 
     try:
         db = db_session_factory()
@@ -19,6 +19,9 @@ SUBSCRIPTION_LIMITS = {
 
 # Promotion codes are now managed in the database via the PromotionCodeUsage model
 
+# Current terms of service version, auto-accepted for OAuth sign-ins
+TERMS_VERSION = "v1.0"
+
 def get_user(db: Session, user_id: int) -> Optional[User]:
     return db.query(User).filter(User.id == user_id).first()
 
@@ -420,7 +423,7 @@ def has_accepted_terms(db: Session, user_id: int, terms_version: str):
     acceptance = get_latest_terms_acceptance(db, user_id, terms_version)
     return acceptance is not None
 
-def auto_accept_terms_for_oauth_user(db: Session, user_id: int, terms_version: str = "v1.0", ip_address: str = "0.0.0.0") -> bool:
+def auto_accept_terms_for_oauth_user(db: Session, user_id: int, terms_version: str = TERMS_VERSION, ip_address: str = "0.0.0.0") -> bool:
     """
     Automatically accept the current terms version for a user created via OAuth.
     This should be called when a user logs in or registers through an OAuth provider.
@@ -428,7 +431,7 @@ def auto_accept_terms_for_oauth_user(db: Session, user_id: int, terms_version: s
     Args:
         db: Database session
         user_id: The ID of the user
-        terms_version: Version of the terms to accept (default: "v1.0")
+        terms_version: Version of the terms to accept (default: TERMS_VERSION)
         ip_address: IP address of the user (default: "0.0.0.0" for system-generated)
         
     Returns:
@@ -1,10 +1,15 @@
+import asyncio
 import logging
 import re
+import time
+import httpx
+import orjson
 import requests
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 import os
 from dotenv import load_dotenv
-from urllib.parse import urlparse
+from collections import OrderedDict
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
 
 # Load environment variables
 load_dotenv()
@@ -14,19 +19,38 @@ GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 GOOGLE_CX = os.getenv("GOOGLE_SEARCH_CX")  # Custom Search Engine ID
 GOOGLE_SEARCH_URL = "https://www.googleapis.com/customsearch/v1"
 
+# Async URL validation settings
+VALIDATION_TIMEOUT = 5
+VALIDATION_LIMITS = httpx.Limits(max_connections=200, max_keepalive_connections=100)
+
+# Results of is_valid_url_async, keyed by normalized URL: url -> (is_valid, expires_at).
+# Popular links appear on many cards, so each one is only requested once per TTL.
+URL_CACHE_TTL = 3600
+URL_CACHE_MAXSIZE = 10_000
+_url_cache = OrderedDict()
+# Checks currently in flight, so concurrent callers for one URL share a request
+_url_inflight = {}
+
 logger = logging.getLogger(__name__)
 
-def is_valid_url(url: str) -> bool:
+def normalize_resources(raw: Any) -> List[Dict[str, Any]]:
     """
-    Validate if a URL is properly formatted and accessible.
+    Convert a card's stored resources to a list of resource dicts.
     
-    Args:
-        url: The URL to validate
-        
-    Returns:
-        bool: True if URL is valid and accessible, False otherwise
+    Resources may be stored as a list or as a JSON-encoded string; anything
+    missing or unparseable becomes an empty list.
     """
-    # First, check if URL has a valid format
+    if not raw:
+        return []
+    if isinstance(raw, (str, bytes)):
+        try:
+            raw = orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            return []
+    return raw if isinstance(raw, list) else []
+
+def _has_valid_format(url: str) -> bool:
+    """Check that a URL is well formed and uses http or https."""
     try:
         result = urlparse(url)
         # Check basic format requirements
@@ -41,6 +65,21 @@ def is_valid_url(url: str) -> bool:
     except Exception as e:
         logger.error(f"Error parsing URL {url}: {str(e)}")
         return False
+    return True
+
+def is_valid_url(url: str) -> bool:
+    """
+    Validate if a URL is properly formatted and accessible.
+    
+    Args:
+        url: The URL to validate
+        
+    Returns:
+        bool: True if URL is valid and accessible, False otherwise
+    """
+    # First, check if URL has a valid format
+    if not _has_valid_format(url):
+        return False
     
     # Try requesting the URL to check if it's accessible
     try:
@@ -52,6 +91,99 @@ def is_valid_url(url: str) -> bool:
         logger.debug(f"URL {url} is not accessible: {str(e)}")
         return False
 
+def create_validation_client() -> httpx.AsyncClient:
+    """
+    Create an async HTTP client for use with is_valid_url_async.
+    
+    One client should be shared across all checks in a run so that
+    connections are pooled instead of opened per URL. HTTP/2 is enabled so
+    concurrent checks against the same host share one connection.
+    """
+    return httpx.AsyncClient(
+        http2=True,
+        limits=VALIDATION_LIMITS,
+        timeout=VALIDATION_TIMEOUT,
+        follow_redirects=True
+    )
+
+def _normalize_url(url: str) -> str:
+    """Reduce a URL to a cache key, ignoring host case, trailing slashes and utm_* parameters."""
+    parts = urlparse(url)
+    query = urlencode([
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_")
+    ])
+    return urlunparse((
+        parts.scheme.lower(),
+        parts.netloc.lower(),
+        parts.path.rstrip("/"),
+        parts.params,
+        query,
+        ""
+    ))
+
+async def is_valid_url_async(client: httpx.AsyncClient, url: str) -> bool:
+    """
+    Async counterpart of is_valid_url that does not block the event loop.
+    
+    Results are cached for URL_CACHE_TTL seconds, and concurrent checks of
+    the same URL wait for a single request.
+    
+    Args:
+        client: Shared client from create_validation_client
+        url: The URL to validate
+        
+    Returns:
+        bool: True if URL is valid and accessible, False otherwise
+    """
+    if not url or not _has_valid_format(url):
+        return False
+    
+    key = _normalize_url(url)
+    cached = _url_cache.get(key)
+    if cached is not None and cached[1] > time.monotonic():
+        _url_cache.move_to_end(key)
+        return cached[0]
+    
+    inflight = _url_inflight.get(key)
+    if inflight is not None:
+        return await asyncio.shield(inflight)
+    
+    future = asyncio.get_running_loop().create_future()
+    _url_inflight[key] = future
+    try:
+        is_valid = await _check_url(client, url)
+        future.set_result(is_valid)
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except BaseException as e:
+        # Waiting callers see the same error as this one, not a cancellation
+        future.set_exception(e)
+        # Mark it retrieved so an unwaited future does not log a warning
+        future.exception()
+        raise
+    finally:
+        del _url_inflight[key]
+    
+    _url_cache[key] = (is_valid, time.monotonic() + URL_CACHE_TTL)
+    _url_cache.move_to_end(key)
+    if len(_url_cache) > URL_CACHE_MAXSIZE:
+        _url_cache.popitem(last=False)
+    return is_valid
+
+async def _check_url(client: httpx.AsyncClient, url: str) -> bool:
+    """Send a HEAD request to check that a URL is accessible."""
+    try:
+        # HEAD avoids downloading the response body
+        response = await client.head(url)
+        # Consider any 2xx or 3xx status code as valid
+        return response.status_code < 400
+    except (httpx.HTTPError, httpx.InvalidURL, ValueError) as e:
+        # InvalidURL and ValueError come from URLs httpx cannot even build a request for
+        logger.debug(f"URL {url} is not accessible: {str(e)}")
+        return False
+
 def search_google(query: str, num_results: int = 3) -> List[Dict[str, str]]:
     """
     Search Google for relevant resources based on a query.
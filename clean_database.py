@@ -5,6 +5,7 @@ from alembic.config import Config
 from alembic import command
 from sqlalchemy import create_engine, text, inspect
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 import time
 from dotenv import load_dotenv
 import requests
@@ -55,10 +56,9 @@ def get_ssl_ca_path():
     print(f"Searched in: {possible_paths}")
     return possible_paths[0]
 
-def table_exists(engine, table_name):
-    """Check if a table exists in the database"""
-    inspector = inspect(engine)
-    return table_name in inspector.get_table_names()
+def get_existing_tables(engine):
+    """Get the names of all tables in the database, fetched once per run"""
+    return set(inspect(engine).get_table_names())
 
 def clean_database_with_alembic():
     """Clean all database tables except users using Alembic and SQLAlchemy"""
@@ -77,7 +77,7 @@ def clean_database_with_alembic():
         }
     }
     
-    engine = create_engine(database_url, connect_args=connect_args)
+    engine = create_engine(database_url, connect_args=connect_args, poolclass=NullPool)
     Session = sessionmaker(bind=engine)
     session = Session()
     
@@ -107,8 +107,9 @@ def clean_database_with_alembic():
             "achievements"
         ]
         
+        existing_tables = get_existing_tables(engine)
         for table in tables_to_clean:
-            if table_exists(engine, table):
+            if table in existing_tables:
                 print(f"\nDeleting data from {table}...")
                 session.execute(text(f"DELETE FROM {table}"))
             else:
@@ -165,7 +166,7 @@ def clean_database_with_alembic_downgrade():
             }
         }
         
-        engine = create_engine(database_url, connect_args=connect_args)
+        engine = create_engine(database_url, connect_args=connect_args, poolclass=NullPool)
         Session = sessionmaker(bind=engine)
         session = Session()
         
@@ -193,8 +194,9 @@ def clean_database_with_alembic_downgrade():
                 "achievements"
             ]
             
+            existing_tables = get_existing_tables(engine)
             for table in tables_to_clean:
-                if table_exists(engine, table):
+                if table in existing_tables:
                     print(f"\nTruncating table {table}...")
                     session.execute(text(f"TRUNCATE TABLE {table}"))
                 else:
@@ -236,7 +238,7 @@ def clean_database_with_direct_sql():
         }
     }
     
-    engine = create_engine(database_url, connect_args=connect_args)
+    engine = create_engine(database_url, connect_args=connect_args, poolclass=NullPool)
     Session = sessionmaker(bind=engine)
     session = Session()
     
@@ -245,8 +247,7 @@ def clean_database_with_direct_sql():
         session.execute(text("SET FOREIGN_KEY_CHECKS=0"))
         
         # Get all tables except users and alembic_version
-        inspector = inspect(engine)
-        all_tables = inspector.get_table_names()
+        all_tables = get_existing_tables(engine)
         tables_to_clean = [t for t in all_tables if t != 'users' and t != 'alembic_version']
         
         # Truncate all tables except users and alembic_version
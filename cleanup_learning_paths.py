@@ -3,23 +3,31 @@ import os
 import sys
 import logging
 from sqlalchemy.orm import Session
-from sqlalchemy.exc import IntegrityError
-from sqlalchemy import and_, or_, text
+from sqlalchemy import and_, bindparam, or_, select, text, update
 
 # Add the parent directory to the Python path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.db import get_db, engine
 from app.models import (
-    Base, LearningPath, User, UserLearningPath, 
+    Base, LearningPath, CourseSection, User, UserLearningPath, UserSection,
     InterestLearningPathRecommendation,
     learning_path_courses, course_section_association, section_cards
 )
+from app.user_tasks.models import DailyTask
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Statements built once at import so SQLAlchemy can reuse their compiled form
+DETACH_BACKEND_TASKS = text(
+    "UPDATE backend_tasks SET learning_path_id = NULL WHERE learning_path_id IN :path_ids"
+).bindparams(bindparam("path_ids", expanding=True))
+DETACH_USER_TASKS = text(
+    "UPDATE user_tasks SET learning_path_id = NULL WHERE learning_path_id IN :path_ids"
+).bindparams(bindparam("path_ids", expanding=True))
+
 def cleanup_learning_paths(db: Session, start_id: int = 81, end_id: int = 100):
     """
     Remove learning paths with IDs in the specified range and all related data:
@@ -29,17 +37,18 @@ def cleanup_learning_paths(db: Session, start_id: int = 81, end_id: int = 100):
     - Course-section associations
     - Section-card associations
     - Course associations
+    - Path-level sections
     """
     try:
-        # Get all learning paths to delete
-        paths_to_delete = db.query(LearningPath).filter(
-            and_(
-                LearningPath.id >= start_id,
-                LearningPath.id <= end_id
+        # Get the IDs of all learning paths to delete (only the id column is needed)
+        path_ids = db.execute(
+            select(LearningPath.id).where(
+                and_(
+                    LearningPath.id >= start_id,
+                    LearningPath.id <= end_id
+                )
             )
-        ).all()
-        
-        path_ids = [path.id for path in paths_to_delete]
+        ).scalars().all()
         
         if not path_ids:
             logger.info(f"No learning paths found in ID range {start_id}-{end_id}")
@@ -47,29 +56,22 @@ def cleanup_learning_paths(db: Session, start_id: int = 81, end_id: int = 100):
         
         logger.info(f"Found {len(path_ids)} learning paths to delete: {path_ids}")
         
+        # Every step below runs in one transaction that is committed once at the
+        # end. Step 0 is the first write, so its rollbacks only undo step 0 itself.
+        
         # 0. Handle backend_tasks records (new step)
         try:
-            # Try to delete from backend_tasks directly
-            for path_id in path_ids:
-                # Try to set learning_path_id to NULL in backend_tasks
-                backend_tasks_count = db.execute(
-                    text("UPDATE backend_tasks SET learning_path_id = NULL WHERE learning_path_id = :path_id"),
-                    {"path_id": path_id}
-                ).rowcount
-                
-                if backend_tasks_count > 0:
-                    logger.info(f"Set NULL for learning_path_id in {backend_tasks_count} backend_tasks records for path {path_id}")
-                
-                # Alternative approach: try user_tasks if backend_tasks doesn't exist
-                user_tasks_count = db.execute(
-                    text("UPDATE user_tasks SET learning_path_id = NULL WHERE learning_path_id = :path_id"),
-                    {"path_id": path_id}
-                ).rowcount
-                
-                if user_tasks_count > 0:
-                    logger.info(f"Set NULL for learning_path_id in {user_tasks_count} user_tasks records for path {path_id}")
-                    
-            db.commit()
+            # Set learning_path_id to NULL in backend_tasks for all paths at once
+            backend_tasks_count = db.execute(DETACH_BACKEND_TASKS, {"path_ids": path_ids}).rowcount
+            
+            if backend_tasks_count > 0:
+                logger.info(f"Set NULL for learning_path_id in {backend_tasks_count} backend_tasks records")
+            
+            # Alternative approach: try user_tasks if backend_tasks doesn't exist
+            user_tasks_count = db.execute(DETACH_USER_TASKS, {"path_ids": path_ids}).rowcount
+            
+            if user_tasks_count > 0:
+                logger.info(f"Set NULL for learning_path_id in {user_tasks_count} user_tasks records")
         except Exception as e:
             logger.warning(f"Could not update backend_tasks/user_tasks: {e}")
             db.rollback()
@@ -86,15 +88,14 @@ def cleanup_learning_paths(db: Session, start_id: int = 81, end_id: int = 100):
                     column_names = [c[0] for c in columns]
                     
                     if 'learning_path_id' in column_names:
-                        # Update to set learning_path_id to NULL
-                        for path_id in path_ids:
-                            count = db.execute(
-                                text(f"UPDATE `{table}` SET learning_path_id = NULL WHERE learning_path_id = :path_id"),
-                                {"path_id": path_id}
-                            ).rowcount
-                            if count > 0:
-                                logger.info(f"Set NULL for learning_path_id in {count} {table} records for path {path_id}")
-                db.commit()
+                        # Update to set learning_path_id to NULL for all paths at once
+                        count = db.execute(
+                            text(f"UPDATE `{table}` SET learning_path_id = NULL WHERE learning_path_id IN :path_ids")
+                            .bindparams(bindparam("path_ids", expanding=True)),
+                            {"path_ids": path_ids}
+                        ).rowcount
+                        if count > 0:
+                            logger.info(f"Set NULL for learning_path_id in {count} {table} records")
             except Exception as e2:
                 logger.warning(f"Could not update task tables: {e2}")
                 db.rollback()
@@ -111,30 +112,34 @@ def cleanup_learning_paths(db: Session, start_id: int = 81, end_id: int = 100):
         ).delete(synchronize_session=False)
         logger.info(f"Deleted {user_path_count} user-learning path associations")
         
-        # 3. Find all course IDs associated with these learning paths
-        course_ids = []
-        for path_id in path_ids:
-            # Query course_ids from learning_path_courses association table
-            path_courses = db.execute(
-                learning_path_courses.select().where(
-                    learning_path_courses.c.learning_path_id == path_id
+        # 3-4. Find all course and section IDs under these learning paths in one
+        # query, instead of one query per path and another per course
+        # Rows are streamed from a server-side cursor straight into the ID sets
+        hierarchy = db.execute(
+            select(
+                learning_path_courses.c.course_id,
+                course_section_association.c.section_id
+            ).select_from(
+                learning_path_courses.outerjoin(
+                    course_section_association,
+                    course_section_association.c.course_id == learning_path_courses.c.course_id
                 )
-            ).fetchall()
-            course_ids.extend([course[1] for course in path_courses])  # [1] is the course_id column
+            ).where(
+                learning_path_courses.c.learning_path_id.in_(path_ids)
+            ),
+            execution_options={"yield_per": 1000}
+        )
         
-        logger.info(f"Found {len(course_ids)} courses associated with these learning paths")
-        
-        # 4. Find all section IDs associated with these courses
-        section_ids = []
-        for course_id in course_ids:
-            # Query section_ids from course_section_association table
-            course_sections = db.execute(
-                course_section_association.select().where(
-                    course_section_association.c.course_id == course_id
-                )
-            ).fetchall()
-            section_ids.extend([section[1] for section in course_sections])  # [1] is the section_id column
+        course_ids = set()
+        section_ids = set()
+        for course_id, section_id in hierarchy:
+            course_ids.add(course_id)
+            if section_id is not None:
+                section_ids.add(section_id)
+        course_ids = sorted(course_ids)
+        section_ids = sorted(section_ids)
         
+        logger.info(f"Found {len(course_ids)} courses associated with these learning paths")
         logger.info(f"Found {len(section_ids)} sections associated with these courses")
         
         # 5. Delete section-card associations
@@ -164,34 +169,66 @@ def cleanup_learning_paths(db: Session, start_id: int = 81, end_id: int = 100):
             )
             logger.info(f"Deleted learning path-course associations for {len(path_ids)} paths")
         
-        # 8. Finally, delete the learning paths themselves
-        for path_id in path_ids:
-            try:
-                path = db.query(LearningPath).filter(LearningPath.id == path_id).first()
-                if path:
-                    db.delete(path)
-                    db.flush()  # Try to flush each delete individually to catch specific errors
-                    logger.info(f"Deleted learning path: ID={path_id}, Title='{path.title}'")
-            except IntegrityError as e:
-                db.rollback()
-                logger.error(f"Failed to delete learning path ID={path_id}: {e}")
-                logger.info(f"Attempting direct SQL delete for path ID={path_id}")
-                
-                # Try more aggressive deletion if needed
-                try:
-                    # Direct SQL approach as a last resort
-                    db.execute(text("DELETE FROM learning_paths WHERE id = :path_id"), {"path_id": path_id})
-                    db.commit()
-                    logger.info(f"Successfully deleted learning path ID={path_id} using direct SQL")
-                except Exception as sql_err:
-                    db.rollback()
-                    logger.error(f"Failed to delete learning path ID={path_id} even with direct SQL: {sql_err}")
+        # 8. Finally, delete the learning paths themselves in one statement.
+        # Bulk deletes skip the ORM unit of work, which used to cascade to
+        # path-level sections and null out task references one path at a time.
+        # Every foreign key into the rows deleted here is therefore handled by hand:
+        # - section_cards.section_id -> course_sections.id (deleted)
+        # - course_section_association.section_id -> course_sections.id (deleted;
+        #   step 6 only covers courses under these paths)
+        # - DailyTask.section_id -> course_sections.id (set to NULL)
+        # - UserSection.section_template_id -> course_sections.id (set to NULL)
+        # - DailyTask.learning_path_id -> learning_paths.id (set to NULL)
+        # - course_sections.learning_path_id -> learning_paths.id (sections deleted)
+        # Task tables found by name are detached in step 0, and the association
+        # tables in steps 1-2 and 5-7.
+        path_section_ids = select(CourseSection.id).where(
+            CourseSection.learning_path_id.in_(path_ids)
+        )
+        db.execute(
+            section_cards.delete().where(
+                section_cards.c.section_id.in_(path_section_ids)
+            )
+        )
+        db.execute(
+            course_section_association.delete().where(
+                course_section_association.c.section_id.in_(path_section_ids)
+            )
+        )
+        section_task_count = db.execute(
+            update(DailyTask).where(
+                DailyTask.section_id.in_(path_section_ids)
+            ).values(section_id=None).execution_options(synchronize_session=False)
+        ).rowcount
+        if section_task_count > 0:
+            logger.info(f"Set NULL for section_id in {section_task_count} daily task records")
+        db.execute(
+            update(UserSection).where(
+                UserSection.section_template_id.in_(path_section_ids)
+            ).values(section_template_id=None).execution_options(synchronize_session=False)
+        )
+        path_task_count = db.execute(
+            update(DailyTask).where(
+                DailyTask.learning_path_id.in_(path_ids)
+            ).values(learning_path_id=None).execution_options(synchronize_session=False)
+        ).rowcount
+        if path_task_count > 0:
+            logger.info(f"Set NULL for learning_path_id in {path_task_count} daily task records")
+        path_section_count = db.query(CourseSection).filter(
+            CourseSection.learning_path_id.in_(path_ids)
+        ).delete(synchronize_session=False)
+        logger.info(f"Deleted {path_section_count} path-level sections")
+        
+        deleted_count = db.query(LearningPath).filter(
+            LearningPath.id.in_(path_ids)
+        ).delete(synchronize_session=False)
+        logger.info(f"Deleted {deleted_count} learning paths")
         
         # Commit all changes
         db.commit()
-        logger.info(f"Successfully deleted {len(path_ids)} learning paths and all related data")
+        logger.info(f"Successfully deleted {deleted_count} learning paths and all related data")
         
-        return len(path_ids)
+        return deleted_count
     
     except Exception as e:
         db.rollback()
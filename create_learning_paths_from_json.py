@@ -2,9 +2,10 @@
 import os
 import sys
 import asyncio
+import argparse
 import logging
-import json
 import time
+import orjson
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from datetime import datetime
@@ -12,14 +13,20 @@ from datetime import datetime
 # Add the parent directory to the Python path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.db import get_db, engine
+from app.db import SessionLocal, engine
 from app.models import (
     Base, LearningPath, User, UserLearningPath, 
     InterestLearningPathRecommendation
 )
 from app.recommendation.schemas import LearningPathStructureRequest, CourseStructureInput, SectionStructureInput
-from app.services.background_tasks import schedule_structured_learning_path_generation, get_task_status
+from app.services.background_tasks import (
+    schedule_structured_learning_path_generation, get_task_status,
+    task_status, _run_structured_path_creation_task
+)
+from app.backend_tasks.schemas import UserTaskCreate, TaskStatusEnum
+from app.backend_tasks.crud import create_user_task
 from app.learning_paths.crud import get_learning_path
+from app.services.learning_path_planner import LearningPathPlannerService
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -39,32 +46,38 @@ TAGS_BY_CATEGORY = {
     "wildcards": [["learning", "meta"], ["curiosity", "fun"]]
 }
 
+def print_divider(char: str, leading_newline: bool = False):
+    """Print a console divider, skipped when INFO logging is disabled"""
+    if logger.isEnabledFor(logging.INFO):
+        print(("\n" if leading_newline else "") + char * 80)
+
 async def create_learning_path_from_structure(
     db: Session,
     interest_id: str,
     path_title: str,
     path_structure: dict,
     user_id: int = 1,
-    task_timeout: int = 180  # 3 minutes timeout
+    task_timeout: int = 180,  # 3 minutes timeout
+    planner_service: LearningPathPlannerService = None
 ) -> dict:
     """Generate a complete learning path with courses and sections using the provided structure"""
     try:
-        # Convert to the expected schema format
-        courses = []
-        for course_data in path_structure["courses"]:
-            sections = []
-            for section_data in course_data["sections"]:
-                sections.append(SectionStructureInput(
-                    title=section_data["title"]
-                ))
-            
-            courses.append(CourseStructureInput(
+        # Convert to the expected schema format. The structures come from our own
+        # JSON file, so model_construct skips pydantic validation; keep Model(...)
+        # for anything built from user-provided data.
+        courses = [
+            CourseStructureInput.model_construct(
                 title=course_data["title"],
-                sections=sections
-            ))
+                sections=[
+                    SectionStructureInput.model_construct(title=section_data["title"])
+                    for section_data in course_data["sections"]
+                ]
+            )
+            for course_data in path_structure["courses"]
+        ]
         
         # Create the full request structure
-        structure_request = LearningPathStructureRequest(
+        structure_request = LearningPathStructureRequest.model_construct(
             prompt=f"Create a learning path about {interest_id.replace('_', ' ')} with title: {path_title}",
             title=path_title,
             courses=courses,
@@ -72,23 +85,16 @@ async def create_learning_path_from_structure(
             estimated_days=30
         )
         
-        # Get required imports to run directly
-        from app.services.background_tasks import task_status, _run_structured_path_creation_task
-        from app.db import SessionLocal
-        from app.backend_tasks.models import UserTask
-        
         # Generate a unique task ID
-        task_id = f"struct_path_gen_{user_id}_{int(time.time())}"
-        logger.info(f"Starting task {task_id} for learning path: {path_title}")
+        task_id = f"struct_path_gen_{user_id}_{time.time_ns()}"
+        logger.info("Starting task %s for learning path: %s", task_id, path_title)
         
         # Create a UserTask if the record exists
         try:
-            from app.backend_tasks.schemas import UserTaskCreate, TaskStatusEnum
-            from app.backend_tasks.crud import create_user_task
             create_user_task(db, UserTaskCreate(task_id=task_id, user_id=user_id, status=TaskStatusEnum.QUEUED))
         except Exception as e:
             # It's okay if this fails - user_tasks might not exist in our DB schema
-            logger.warning(f"Could not create user task record: {e}")
+            logger.warning("Could not create user task record: %s", e)
         
         # Initialize task status
         task_status[task_id] = {
@@ -115,7 +121,8 @@ async def create_learning_path_from_structure(
             db_session_factory=SessionLocal,
             user_id=user_id,
             structure_request=structure_request,
-            timeout_seconds=task_timeout
+            timeout_seconds=task_timeout,
+            planner_service=planner_service
         )
         
         # Check status and get learning path ID
@@ -123,11 +130,11 @@ async def create_learning_path_from_structure(
         learning_path_id = status.get("learning_path_id")
         
         if not learning_path_id:
-            logger.error(f"Failed to get learning path ID for task {task_id}")
+            logger.error("Failed to get learning path ID for task %s", task_id)
             return None
         
         # Log success
-        logger.info(f"Successfully generated learning path: {path_title} (ID: {learning_path_id})")
+        logger.info("Successfully generated learning path: %s (ID: %s)", path_title, learning_path_id)
         
         return {
             "interest_id": interest_id,
@@ -135,26 +142,15 @@ async def create_learning_path_from_structure(
             "title": path_title
         }
     except Exception as e:
-        logger.error(f"Error generating learning path for {interest_id}: {e}", exc_info=True)
+        logger.error("Error generating learning path for %s: %s", interest_id, e, exc_info=True)
         return None
 
 async def create_interest_recommendations(db: Session, paths_data: list):
     """Create associations between interests and learning paths"""
     recommendations_created = 0
     
-    # Group paths by interest for proper indexing
-    paths_by_interest = {}
-    for path_data in paths_data:
-        if not path_data:
-            continue
-        
-        interest_id = path_data["interest_id"]
-        if interest_id not in paths_by_interest:
-            paths_by_interest[interest_id] = []
-        
-        paths_by_interest[interest_id].append(path_data)
-    
-    # Process each path
+    # Single pass: track each path's position within its interest category as we go
+    interest_counters = {}
     for path_data in paths_data:
         if not path_data:
             continue
@@ -164,20 +160,16 @@ async def create_interest_recommendations(db: Session, paths_data: list):
         path_title = path_data["title"]
         
         # Get the index of this path within its interest category
-        interest_paths = paths_by_interest.get(interest_id, [])
-        path_index = 0  # Default to first position
-        
-        for i, p in enumerate(interest_paths):
-            if p["title"] == path_title:
-                path_index = i
-                break
+        path_index = interest_counters.get(interest_id, 0)
+        interest_counters[interest_id] = path_index + 1
         
         # Determine score and priority
         score = 0.95 if path_index == 0 else 0.88
         priority = path_index + 1  # Priority is 1-based (1 is highest)
         
         # Get tags for this interest path
-        tags = TAGS_BY_CATEGORY[interest_id][path_index] if path_index < len(TAGS_BY_CATEGORY.get(interest_id, [])) else None
+        interest_tags = TAGS_BY_CATEGORY.get(interest_id) or ()
+        tags = interest_tags[path_index] if path_index < len(interest_tags) else None
         
         # Check if recommendation already exists
         existing_rec = db.query(InterestLearningPathRecommendation).filter(
@@ -186,7 +178,7 @@ async def create_interest_recommendations(db: Session, paths_data: list):
         ).first()
         
         if existing_rec:
-            logger.info(f"Recommendation already exists for {interest_id} -> {path_title}")
+            logger.info("Recommendation already exists for %s -> %s", interest_id, path_title)
             existing_rec.score = score
             existing_rec.priority = priority
             existing_rec.tags = tags
@@ -209,10 +201,10 @@ async def create_interest_recommendations(db: Session, paths_data: list):
         try:
             db.flush()
             recommendations_created += 1
-            logger.info(f"Created recommendation: {interest_id} -> {path_title} (score: {score}, priority: {priority})")
+            logger.info("Created recommendation: %s -> %s (score: %s, priority: %s)", interest_id, path_title, score, priority)
         except IntegrityError as e:
             db.rollback()
-            logger.error(f"Failed to create recommendation {interest_id} -> {path_title}: {e}")
+            logger.error("Failed to create recommendation %s -> %s: %s", interest_id, path_title, e)
     
     db.commit()
     return recommendations_created
@@ -220,7 +212,8 @@ async def create_interest_recommendations(db: Session, paths_data: list):
 def update_admin_interests(db: Session):
     """Update admin user's interests to include all interest categories"""
     try:
-        admin = db.query(User).filter(User.id == 1).first()
+        # Only load the interests column rather than the full User row
+        admin = db.query(User.interests).filter(User.id == 1).first()
         if not admin:
             logger.warning("Admin user (ID=1) not found")
             return False
@@ -231,23 +224,25 @@ def update_admin_interests(db: Session):
             logger.warning("No interests found in STRUCTURES_BY_INTEREST")
             return False
         
+        # Skip the write entirely when nothing changed
+        if set(admin.interests or []) == set(interests):
+            logger.info("Admin interests already up to date")
+            return True
+        
         # Update the admin's interests
-        admin.interests = interests
-        db.add(admin)
+        db.query(User).filter(User.id == 1).update({"interests": interests}, synchronize_session=False)
         db.commit()
         
-        logger.info(f"Updated admin user's interests: {interests}")
+        logger.info("Updated admin user's interests: %s", interests)
         return True
     except Exception as e:
-        logger.error(f"Error updating admin interests: {e}", exc_info=True)
+        logger.error("Error updating admin interests: %s", e, exc_info=True)
         db.rollback()
         return False
 
 # Function to extract learning paths to process from command line arguments
 def get_paths_to_process(structures_by_interest):
     """Extract paths to process based on command line arguments"""
-    import argparse
-    
     parser = argparse.ArgumentParser(description='Generate learning paths from JSON structures')
     parser.add_argument('--interest', type=str, help='Process a specific interest category')
     parser.add_argument('--path', type=str, help='Process a specific learning path title')
@@ -297,12 +292,12 @@ async def main():
     try:
         # Load learning path structures from JSON file
         try:
-            with open('learning_path_structures.json', 'r') as f:
-                STRUCTURES_BY_INTEREST = json.load(f)
+            with open('learning_path_structures.json', 'rb') as f:
+                STRUCTURES_BY_INTEREST = orjson.loads(f.read())
             total_paths = sum(len(paths) for paths in STRUCTURES_BY_INTEREST.values())
-            logger.info(f"Loaded {total_paths} learning path structures")
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            logger.error(f"Error loading learning path structures: {e}")
+            logger.info("Loaded %d learning path structures", total_paths)
+        except (FileNotFoundError, orjson.JSONDecodeError) as e:
+            logger.error("Error loading learning path structures: %s", e)
             return
         
         # Get paths to process based on command line arguments
@@ -313,8 +308,8 @@ async def main():
             return
             
         total_to_process = len(paths_to_process)
-        logger.info(f"STARTING BATCH GENERATION: Will process {total_to_process} learning paths")
-        logger.info(f"Timeout set to {task_timeout} seconds per learning path")
+        logger.info("STARTING BATCH GENERATION: Will process %d learning paths", total_to_process)
+        logger.info("Timeout set to %s seconds per learning path", task_timeout)
         
         # Print a summary of what will be processed
         interest_summary = {}
@@ -325,17 +320,19 @@ async def main():
             interest_summary[interest_id] += 1
         
         for interest, count in interest_summary.items():
-            logger.info(f"  - {interest}: {count} paths")
+            logger.info("  - %s: %d paths", interest, count)
         
-        # Create a DB session
-        db = next(get_db())
+        # Create a DB session; the context manager closes it even if a step raises
+        # One planner service for the whole batch so every path reuses the same
+        # AI agents and their pooled HTTP connections
+        planner_service = LearningPathPlannerService()
         
-        try:
+        with SessionLocal() as db:
             # Generate learning paths one at a time
             paths_data = []
             successful_count = 0
             failed_count = 0
-            overall_start_time = time.time()
+            overall_start_time = time.perf_counter_ns()
             
             for i, path_info in enumerate(paths_to_process):
                 interest_id = path_info["interest_id"]
@@ -343,49 +340,59 @@ async def main():
                 structure = path_info["structure"]
                 
                 progress_str = f"[{i+1}/{total_to_process}]"
-                print("\n" + "="*80)
-                logger.info(f"{progress_str} STARTING: {interest_id} - \"{path_title}\"")
-                print("="*80)
+                print_divider("=", leading_newline=True)
+                logger.info("%s STARTING: %s - \"%s\"", progress_str, interest_id, path_title)
+                print_divider("=")
                 
                 # Generate learning path
-                start_time = time.time()
-                path_data = await create_learning_path_from_structure(
-                    db=db, 
-                    interest_id=interest_id,
-                    path_title=path_title,
-                    path_structure=structure,
-                    task_timeout=task_timeout
-                )
-                duration = time.time() - start_time
+                start_time = time.perf_counter_ns()
+                try:
+                    # Enforce the timeout at the call site as well so a stuck path is
+                    # cancelled instead of blocking the rest of the batch
+                    path_data = await asyncio.wait_for(
+                        create_learning_path_from_structure(
+                            db=db, 
+                            interest_id=interest_id,
+                            path_title=path_title,
+                            path_structure=structure,
+                            task_timeout=task_timeout,
+                            planner_service=planner_service
+                        ),
+                        timeout=task_timeout + 10
+                    )
+                except asyncio.TimeoutError:
+                    logger.error("%s TIMED OUT: %s - \"%s\" exceeded %ss", progress_str, interest_id, path_title, task_timeout + 10)
+                    path_data = None
+                duration = (time.perf_counter_ns() - start_time) / 1e9
                 
                 if path_data:
                     paths_data.append(path_data)
                     successful_count += 1
-                    print("\n" + "-"*80)
-                    logger.info(f"{progress_str} COMPLETED: {interest_id} - \"{path_title}\" (ID: {path_data['learning_path_id']}) in {duration:.1f}s")
-                    logger.info(f"Progress: {successful_count} complete, {failed_count} failed, {total_to_process - i - 1} remaining")
-                    print("-"*80)
+                    print_divider("-", leading_newline=True)
+                    logger.info("%s COMPLETED: %s - \"%s\" (ID: %s) in %.1fs", progress_str, interest_id, path_title, path_data['learning_path_id'], duration)
+                    logger.info("Progress: %d complete, %d failed, %d remaining", successful_count, failed_count, total_to_process - i - 1)
+                    print_divider("-")
                 else:
                     failed_count += 1
-                    print("\n" + "-"*80)
-                    logger.warning(f"{progress_str} FAILED: {interest_id} - \"{path_title}\" after {duration:.1f}s")
-                    logger.info(f"Progress: {successful_count} complete, {failed_count} failed, {total_to_process - i - 1} remaining")
-                    print("-"*80)
+                    print_divider("-", leading_newline=True)
+                    logger.warning("%s FAILED: %s - \"%s\" after %.1fs", progress_str, interest_id, path_title, duration)
+                    logger.info("Progress: %d complete, %d failed, %d remaining", successful_count, failed_count, total_to_process - i - 1)
+                    print_divider("-")
                 
                 # Add a delay between path creations
                 if i < total_to_process - 1:  # Don't wait after the last one
                     next_path = paths_to_process[i+1]
-                    logger.info(f"Waiting 2 seconds before starting next path: {next_path['interest_id']} - \"{next_path['path_title']}\"")
+                    logger.info("Waiting 2 seconds before starting next path: %s - \"%s\"", next_path['interest_id'], next_path['path_title'])
                     await asyncio.sleep(2)
             
             # Create recommendations for all successfully generated paths
             if paths_data:
-                print("\n" + "="*80)
-                logger.info(f"CREATING RECOMMENDATIONS: {len(paths_data)} learning path associations")
-                print("="*80)
+                print_divider("=", leading_newline=True)
+                logger.info("CREATING RECOMMENDATIONS: %d learning path associations", len(paths_data))
+                print_divider("=")
                 
                 recommendations = await create_interest_recommendations(db, paths_data)
-                logger.info(f"Created {recommendations} interest-learning path recommendations")
+                logger.info("Created %d interest-learning path recommendations", recommendations)
                 
                 # Update admin interests
                 if update_admin_interests(db):
@@ -393,7 +400,7 @@ async def main():
                 else:
                     logger.warning("Failed to update admin user interests")
             
-            total_duration = time.time() - overall_start_time
+            total_duration = (time.perf_counter_ns() - overall_start_time) / 1e9
             hours, remainder = divmod(total_duration, 3600)
             minutes, seconds = divmod(remainder, 60)
             time_str = ''
@@ -403,16 +410,27 @@ async def main():
                 time_str += f"{int(minutes)} minutes, "
             time_str += f"{seconds:.1f} seconds"
             
-            print("\n" + "="*80)
-            logger.info(f"GENERATION COMPLETE: {successful_count} paths created, {failed_count} failed")
-            logger.info(f"Total time: {time_str}")
-            print("="*80)
-            
-        finally:
-            db.close()
+            print_divider("=", leading_newline=True)
+            logger.info("GENERATION COMPLETE: %d paths created, %d failed", successful_count, failed_count)
+            logger.info("Total time: %s", time_str)
+            print_divider("=")
             
     except Exception as e:
-        logger.error(f"An error occurred: {e}", exc_info=True)
+        logger.error("An error occurred: %s", e, exc_info=True)
 
 if __name__ == "__main__":
-    asyncio.run(main()) 
\ No newline at end of file
+    # Prefer uvloop's event loop when it is installed; fall back to the default loop
+    try:
+        import uvloop
+        loop_factory = uvloop.new_event_loop
+    except ImportError:
+        loop_factory = None
+    
+    if hasattr(asyncio, "Runner"):
+        with asyncio.Runner(loop_factory=loop_factory) as runner:
+            runner.run(main())
+    else:
+        # asyncio.Runner is Python 3.11+; older versions select the loop through the policy
+        if loop_factory is not None:
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        asyncio.run(main()) 
\ No newline at end of file
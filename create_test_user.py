@@ -1,6 +1,6 @@
 import sys
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, exists
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
 import bcrypt  # 直接使用 bcrypt 而不是通过 passlib
@@ -11,39 +11,40 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from app.models import User, Base
 from app.db import SessionLocal
 
-def create_test_user(email, username, password, is_superuser=False):
-    db = SessionLocal()
-    
-    try:
-        # 检查用户是否已存在 - 使用更具体的查询，只选择必要的列
-        existing_user = db.query(User.id).filter(User.email == email).first()
-        if existing_user:
-            print(f"user {email} already exists")
-            return
+# 种子/测试账号使用较低的 bcrypt 成本以加快批量创建；生产环境的哈希不受影响
+SEED_BCRYPT_ROUNDS = 4
+
+def create_test_user(email, username, password, is_superuser=False, rounds=None):
+    if rounds is None:
+        rounds = SEED_BCRYPT_ROUNDS if os.environ.get("SEED_MODE") else 12
+    with SessionLocal() as db:
+        try:
+            # 检查用户是否已存在 - 使用 SELECT EXISTS，数据库可提前返回且不需要构造行对象
+            if db.query(exists().where(User.email == email)).scalar():
+                print(f"user {email} already exists")
+                return
         
-        # 创建新用户 - 使用 bcrypt 直接哈希密码
-        password_bytes = password.encode('utf-8')
-        salt = bcrypt.gensalt()
-        hashed_password = bcrypt.hashpw(password_bytes, salt).decode('utf-8')
+            # 创建新用户 - 使用 bcrypt 直接哈希密码
+            password_bytes = password.encode('utf-8')
+            salt = bcrypt.gensalt(rounds=rounds)
+            hashed_password = bcrypt.hashpw(password_bytes, salt).decode('utf-8')
         
-        new_user = User(
-            email=email,
-            username=username,
-            hashed_password=hashed_password,
-            is_active=True,
-            is_superuser=is_superuser,
-            created_at=datetime.now(),
-            updated_at=datetime.now()
-        )
+            new_user = User(
+                email=email,
+                username=username,
+                hashed_password=hashed_password,
+                is_active=True,
+                is_superuser=is_superuser,
+                created_at=datetime.now(),
+                updated_at=datetime.now()
+            )
         
-        db.add(new_user)
-        db.commit()
-        print(f"user {email} created")
-    except Exception as e:
-        db.rollback()
-        print(f"create user {email} error: {e}")
-    finally:
-        db.close()
+            db.add(new_user)
+            db.commit()
+            print(f"user {email} created")
+        except Exception as e:
+            db.rollback()
+            print(f"create user {email} error: {e}")
 
 if __name__ == "__main__":
     create_test_user("admin@example.com", "admin", "admin123", is_superuser=True)
@@ -31,73 +31,57 @@ def delete_user_by_email(email: str, confirm: bool = False) -> bool:
     Returns:
         bool: True if user was deleted, False otherwise
     """
-    db = SessionLocal()
-    try:
-        # Find the user by email
-        user = db.query(User).filter(User.email == email).first()
+    with SessionLocal() as db:
+        try:
+            # Find the user by email
+            user = db.query(User).filter(User.email == email).first()
         
-        if not user:
-            print(f"No user found with email: {email}")
-            return False
-        
-        # Display user information
-        print(f"Found user: {user.username} (ID: {user.id}, Email: {user.email})")
-        
-        # Confirm deletion
-        if not confirm:
-            confirmation = input("Are you sure you want to delete this user? This action cannot be undone. (y/n): ")
-            if confirmation.lower() not in ["y", "yes"]:
-                print("Deletion canceled.")
+            if not user:
+                print(f"No user found with email: {email}")
                 return False
-                
-        user_id = user.id
-        
-        # Delete all related records before deleting the user
-        # We need to delete these manually because some might not have CASCADE set up correctly
-        
-        # First, delete terms acceptance records
-        terms_count = db.query(UserTermsAcceptance).filter(UserTermsAcceptance.user_id == user_id).delete()
-        print(f"Deleted {terms_count} terms acceptance records")
         
-        # Delete daily usage records
-        daily_usage_count = db.query(UserDailyUsage).filter(UserDailyUsage.user_id == user_id).delete()
-        print(f"Deleted {daily_usage_count} daily usage records")
+            # Display user information
+            print(f"Found user: {user.username} (ID: {user.id}, Email: {user.email})")
         
-        # Delete user learning paths
-        learning_paths_count = db.query(UserLearningPath).filter(UserLearningPath.user_id == user_id).delete()
-        print(f"Deleted {learning_paths_count} learning path records")
-        
-        # Delete user course records
-        courses_count = db.query(UserCourse).filter(UserCourse.user_id == user_id).delete()
-        print(f"Deleted {courses_count} course records")
-        
-        # Delete user section records
-        sections_count = db.query(UserSection).filter(UserSection.user_id == user_id).delete()
-        print(f"Deleted {sections_count} section records")
-        
-        # Delete daily logs
-        logs_count = db.query(DailyLog).filter(DailyLog.user_id == user_id).delete()
-        print(f"Deleted {logs_count} daily log records")
+            # Confirm deletion
+            if not confirm:
+                confirmation = input("Are you sure you want to delete this user? This action cannot be undone. (y/n): ")
+                if confirmation.lower() not in ["y", "yes"]:
+                    print("Deletion canceled.")
+                    return False
+                
+            user_id = user.id
         
-        # Commit these deletions to avoid foreign key issues
-        db.commit()
+            # Delete all related records before deleting the user
+            # We need to delete these manually because some might not have CASCADE set up correctly.
+            # Everything below runs in the session's single transaction and is committed once,
+            # and synchronize_session=False skips the identity-map scan for each bulk DELETE.
+            related_models = [
+                (UserTermsAcceptance, "terms acceptance"),
+                (UserDailyUsage, "daily usage"),
+                (UserLearningPath, "learning path"),
+                (UserCourse, "course"),
+                (UserSection, "section"),
+                (DailyLog, "daily log"),
+            ]
+            for model, label in related_models:
+                count = db.query(model).filter(model.user_id == user_id).delete(synchronize_session=False)
+                print(f"Deleted {count} {label} records")
         
-        # Now delete the user
-        db.delete(user)
-        db.commit()
+            # Now delete the user; the child rows are already gone within this transaction
+            db.delete(user)
+            db.commit()
         
-        print(f"User {email} has been successfully deleted.")
-        return True
+            print(f"User {email} has been successfully deleted.")
+            return True
         
-    except SQLAlchemyError as e:
-        db.rollback()
-        print(f"Database error: {str(e)}")
-        return False
-    except Exception as e:
-        print(f"Error: {str(e)}")
-        return False
-    finally:
-        db.close()
+        except SQLAlchemyError as e:
+            db.rollback()
+            print(f"Database error: {str(e)}")
+            return False
+        except Exception as e:
+            print(f"Error: {str(e)}")
+            return False
 
 if __name__ == "__main__":
     # Check if email is provided as command line argument
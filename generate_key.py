@@ -1,7 +1,16 @@
 import secrets
 
-# Generate a secure random key (32 bytes is a common length)
-key = secrets.token_hex(32)
+# Number of random bytes behind the key (32 bytes is a common length)
+KEY_BYTES = 32
 
-print(f"Generated Secret Key: {key}")
-print("Set this key as the SECRET_KEY environment variable for your Flask app.") 
\ No newline at end of file
+
+def generate() -> str:
+    """Generate a secure, URL-safe random key."""
+    return secrets.token_urlsafe(KEY_BYTES)
+
+
+if __name__ == "__main__":
+    key = generate()
+    print(f"Generated Secret Key: {key}")
+    print(f"({KEY_BYTES} random bytes, {len(key)} URL-safe characters)")
+    print("Set this key as the SECRET_KEY environment variable for your Flask app.")
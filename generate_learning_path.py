@@ -1,54 +1,152 @@
-import requests
-import json
+import argparse
+import asyncio
+import logging
+import os
+import shelve
+import time
+import httpx
 import random
+from types import SimpleNamespace
 from typing import List, Dict, Any
-from functools import lru_cache
+from functools import wraps
+
+logger = logging.getLogger(__name__)
 
 # Base URL for your API
 BASE_URL = "http://localhost:8000/api"  # Adjust if your server runs on a different port
 
+# Endpoint URLs, joined once; per-id URLs extend these prefixes
+_URLS = SimpleNamespace(
+    token=f"{BASE_URL}/token",
+    learning_paths=f"{BASE_URL}/learning-paths",
+    learning_path_courses=f"{BASE_URL}/learning-path-courses",
+    courses=f"{BASE_URL}/courses",
+    course_sections=f"{BASE_URL}/course-sections",
+    sections=f"{BASE_URL}/sections",
+    cards=f"{BASE_URL}/cards",
+    generate_card=f"{BASE_URL}/generate-card",
+    user_courses=f"{BASE_URL}/users/me/courses",
+    user_sections=f"{BASE_URL}/users/me/sections",
+)
+
 # Authentication credentials
 AUTH_EMAIL = "admin@example.com"
 AUTH_PASSWORD = "admin123"
 
-# Global variable to store the token
-_ACCESS_TOKEN = None
+# Connection pool shared by every concurrent request in a run (set on the transport)
+HTTP_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=20)
 
-@lru_cache(maxsize=1)
-def get_access_token() -> str:
-    """Login and return the access token (cached)"""
-    global _ACCESS_TOKEN
-    
-    # If we already have a token, return it
-    if _ACCESS_TOKEN:
-        return _ACCESS_TOKEN
-    
-    login_data = {
-        "username": AUTH_EMAIL,
-        "password": AUTH_PASSWORD
-    }
-    
-    # We know this endpoint works
-    endpoint = f"{BASE_URL}/token"
-    
-    try:
-        print(f"Authenticating at: {endpoint}")
-        response = requests.post(endpoint, data=login_data)
-        response.raise_for_status()
-        
-        # Store the token globally
-        _ACCESS_TOKEN = response.json()["access_token"]
-        print("Authentication successful")
-        return _ACCESS_TOKEN
+# Number of cards created concurrently within a section
+CARD_CONCURRENCY = 8
+
+# Seed for the template randomness (days, levels, tags); set an int for reproducible runs
+RANDOM_SEED = None
+CARD_LEVELS = ["beginner", "intermediate", "advanced"]
+CARD_FOCUSES = ["practical", "theoretical", "foundational"]
+
+# On-disk cache for the get_* listings, shared across runs (disable with --no-cache)
+DISK_CACHE_PATH = os.path.join(".cache", "genlp")
+DISK_CACHE_TTL = 60
+DISK_CACHE_ENABLED = True
+
+# Login endpoint used by BearerLogin below
+TOKEN_URL = _URLS.token
+
+class BearerLogin(httpx.Auth):
+    """Log in on first use, send the bearer token, and re-login once on a 401"""
+    requires_response_body = True
+
+    def __init__(self):
+        self._token = None
+
+    def _login_request(self) -> httpx.Request:
+        logger.debug("Authenticating at: %s", TOKEN_URL)
+        return httpx.Request("POST", TOKEN_URL, data={"username": AUTH_EMAIL, "password": AUTH_PASSWORD})
+
+    def _store_token(self, response: httpx.Response) -> None:
+        if response.is_error:
+            logger.error("Authentication failed: %s", response.status_code)
+            raise Exception(f"Failed to authenticate: {response.status_code} {response.text}")
+        self._token = response.json()["access_token"]
+        logger.debug("Authentication successful")
+
+    def auth_flow(self, request: httpx.Request):
+        if self._token is None:
+            self._store_token((yield self._login_request()))
+        request.headers["Authorization"] = f"Bearer {self._token}"
+        response = yield request
         
-    except requests.exceptions.RequestException as e:
-        print(f"Authentication failed: {e}")
-        raise Exception(f"Failed to authenticate: {e}")
+        if response.status_code == 401:
+            # Token expired: log in again and retry the request once
+            self._store_token((yield self._login_request()))
+            request.headers["Authorization"] = f"Bearer {self._token}"
+            yield request
+
+def ttl_cache(seconds: int):
+    """Cache an async getter's result in memory for `seconds`.
+
+    The getter takes the client as its only argument; the cache ignores it.
+    The wrapped function gets a cache_clear() so callers can invalidate it
+    after creating new rows; it also clears any cache layer underneath.
+    """
+    def decorator(func):
+        entry = {}
+        lock = asyncio.Lock()
+        inner_clear = getattr(func, "cache_clear", None)
+
+        @wraps(func)
+        async def wrapper(client: httpx.AsyncClient):
+            # The lock also makes concurrent callers share one in-flight fetch
+            async with lock:
+                now = time.monotonic()
+                if entry and entry["expires_at"] > now:
+                    return entry["value"]
+                value = await func(client)
+                entry["value"] = value
+                entry["expires_at"] = now + seconds
+                return value
+
+        def cache_clear():
+            entry.clear()
+            if inner_clear:
+                inner_clear()
+
+        wrapper.cache_clear = cache_clear
+        return wrapper
+    return decorator
+
+def disk_ttl_cache(name: str, ttl: int = DISK_CACHE_TTL):
+    """Persist an async getter's result in a shelve file for `ttl` seconds.
+
+    Entries are keyed by (name, API server, auth user), so the in-memory
+    ttl_cache above only misses to disk instead of the API on a fresh run,
+    and runs against different servers never share entries.
+    """
+    key = f"{name}:{BASE_URL}:{AUTH_EMAIL}"
 
-def get_auth_headers() -> Dict[str, str]:
-    """Get the authorization headers with the access token"""
-    token = get_access_token()
-    return {"Authorization": f"Bearer {token}"}
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(client: httpx.AsyncClient):
+            if not DISK_CACHE_ENABLED:
+                return await func(client)
+            with shelve.open(DISK_CACHE_PATH) as cache:
+                hit = cache.get(key)
+            if hit and hit[0] > time.time():
+                return hit[1]
+            value = await func(client)
+            with shelve.open(DISK_CACHE_PATH) as cache:
+                cache[key] = (time.time() + ttl, value)
+            return value
+
+        def cache_clear():
+            if not DISK_CACHE_ENABLED:
+                return
+            with shelve.open(DISK_CACHE_PATH) as cache:
+                cache.pop(key, None)
+
+        wrapper.cache_clear = cache_clear
+        return wrapper
+    return decorator
 
 # Learning path themes with engaging question-based titles
 LEARNING_PATHS = [
@@ -85,24 +183,24 @@ CARD_KEYWORDS_BY_PATH = [
     ]
 ]
 
-def create_learning_path(path_data: Dict[str, Any]) -> Dict[str, Any]:
+async def create_learning_path(client: httpx.AsyncClient, path_data: Dict[str, Any]) -> Dict[str, Any]:
     """Create a learning path and return the created object"""
-    headers = get_auth_headers()
-    response = requests.post(f"{BASE_URL}/learning-paths", json=path_data, headers=headers)
+    response = await client.post(_URLS.learning_paths, json=path_data)
     response.raise_for_status()
+    get_learning_paths.cache_clear()
+    _learning_path_titles.cache_clear()
     return response.json()
 
-def create_course(course_data: Dict[str, Any]) -> Dict[str, Any]:
+async def create_course(client: httpx.AsyncClient, course_data: Dict[str, Any]) -> Dict[str, Any]:
     """Create a course and return the created object"""
-    headers = get_auth_headers()
-    response = requests.post(f"{BASE_URL}/courses", json=course_data, headers=headers)
+    response = await client.post(_URLS.courses, json=course_data)
     response.raise_for_status()
+    get_courses.cache_clear()
+    _course_titles.cache_clear()
     return response.json()
 
-def create_section(section_data: Dict[str, Any], course_id: int = None) -> Dict[str, Any]:
+async def create_section(client: httpx.AsyncClient, section_data: Dict[str, Any], course_id: int = None) -> Dict[str, Any]:
     """Create a section and return the created object"""
-    headers = get_auth_headers()
-    
     try:
         if course_id:
             # Create a course section with the correct data structure
@@ -117,97 +215,116 @@ def create_section(section_data: Dict[str, Any], course_id: int = None) -> Dict[
                     "estimated_days": section_data.get("estimated_days", 1)
                 }
             }
-            print(f"Creating course section with data: {json.dumps(data, indent=2)}")
-            response = requests.post(f"{BASE_URL}/course-sections", json=data, headers=headers)
+            logger.debug("Creating course section with data: %s", data)
+            response = await client.post(_URLS.course_sections, json=data)
             response.raise_for_status()
+            get_sections.cache_clear()
+            _section_titles.cache_clear()
             return response.json()
         else:
             # Create a standalone section
-            print(f"Creating standalone section with data: {json.dumps(section_data, indent=2)}")
-            response = requests.post(f"{BASE_URL}/sections", json=section_data, headers=headers)
+            logger.debug("Creating standalone section with data: %s", section_data)
+            response = await client.post(_URLS.sections, json=section_data)
             response.raise_for_status()
+            get_sections.cache_clear()
+            _section_titles.cache_clear()
             return response.json()
-    except requests.exceptions.HTTPError as e:
-        print(f"Error creating section: {e}")
-        if hasattr(e.response, 'text'):
-            print(f"Response content: {e.response.text}")
+    except httpx.HTTPStatusError as e:
+        logger.warning("Error creating section: %s", e)
+        logger.debug("Response content: %s", e.response.text)
         raise
 
-def create_card(card_data: Dict[str, Any]) -> Dict[str, Any]:
+async def create_card(client: httpx.AsyncClient, card_data: Dict[str, Any]) -> Dict[str, Any]:
     """Create a card and return the created object"""
-    headers = get_auth_headers()
-    
     try:
-        print(f"Creating card with data: {card_data}")
-        print(f"Sending request to: {BASE_URL}/cards")
-        print(f"Headers: {headers}")
+        logger.debug("Creating card with data: %s", card_data)
         
-        response = requests.post(f"{BASE_URL}/cards", json=card_data, headers=headers)
+        response = await client.post(_URLS.cards, json=card_data)
         
-        print(f"Response status code: {response.status_code}")
-        print(f"Response content: {response.text}")
+        logger.debug("Card response %s: %s", response.status_code, response.text)
         
         response.raise_for_status()
+        get_cards.cache_clear()
+        _card_keywords.cache_clear()
         return response.json()
-    except requests.exceptions.HTTPError as e:
-        print(f"HTTP Error: {e}")
+    except httpx.HTTPStatusError as e:
+        logger.warning("HTTP Error: %s", e)
         # Try the generate-card endpoint as a fallback
         try:
             generate_data = {
                 "keyword": card_data["keyword"],
                 "context": card_data.get("explanation", "")
             }
-            response = requests.post(f"{BASE_URL}/generate-card", json=generate_data, headers=headers)
+            response = await client.post(_URLS.generate_card, json=generate_data)
             response.raise_for_status()
+            get_cards.cache_clear()
+            _card_keywords.cache_clear()
             return response.json()
-        except requests.exceptions.HTTPError as e:
-            print(f"Generate card HTTP Error: {e}")
+        except httpx.HTTPStatusError as e:
+            logger.warning("Generate card HTTP Error: %s", e)
             raise
 
-def add_course_to_learning_path(learning_path_id: int, course_id: int, order_index: int) -> None:
+async def add_course_to_learning_path(client: httpx.AsyncClient, learning_path_id: int, course_id: int, order_index: int) -> None:
     """Add a course to a learning path"""
-    headers = get_auth_headers()
-    
     # The API expects query parameters, not JSON body
-    response = requests.post(
-        f"{BASE_URL}/learning-path-courses?learning_path_id={learning_path_id}&course_id={course_id}&order_index={order_index}", 
-        headers=headers
+    response = await client.post(
+        _URLS.learning_path_courses,
+        params={"learning_path_id": learning_path_id, "course_id": course_id, "order_index": order_index}
     )
     response.raise_for_status()
 
-def add_section_to_course(course_id: int, section_id: int, order_index: int) -> None:
+# Endpoint that worked for each probing helper, discovered on first use
+_ENDPOINT_CACHE: Dict[str, Any] = {}
+
+async def _post_course_section_path(client: httpx.AsyncClient, course_id: int, section_id: int, order_index: int) -> httpx.Response:
+    # The course/{id}/sections endpoint
+    return await client.post(
+        f"{_URLS.courses}/{course_id}/sections",
+        json={"section_id": section_id, "order_index": order_index}
+    )
+
+async def _post_course_sections_query(client: httpx.AsyncClient, course_id: int, section_id: int, order_index: int) -> httpx.Response:
+    # The course-sections endpoint with query parameters
+    return await client.post(
+        _URLS.course_sections,
+        params={"course_id": course_id, "section_id": section_id, "order_index": order_index}
+    )
+
+async def _post_user_course_section(client: httpx.AsyncClient, course_id: int, section_id: int, order_index: int) -> httpx.Response:
+    # The users/me/courses/{id}/sections endpoint as a last resort
+    return await client.post(
+        f"{_URLS.user_courses}/{course_id}/sections",
+        json={"section_id": section_id, "order_index": order_index}
+    )
+
+_ADD_SECTION_VARIANTS = [_post_course_section_path, _post_course_sections_query, _post_user_course_section]
+
+async def add_section_to_course(client: httpx.AsyncClient, course_id: int, section_id: int, order_index: int) -> None:
     """Add a section to a course"""
-    headers = get_auth_headers()
+    cached = _ENDPOINT_CACHE.get("add_section_to_course")
+    if cached:
+        try:
+            (await cached(client, course_id, section_id, order_index)).raise_for_status()
+        except httpx.TransportError:
+            # Re-probe on the next call; HTTP errors are real failures, not a wrong endpoint
+            _ENDPOINT_CACHE.pop("add_section_to_course", None)
+            raise
+        return
     
-    # Try different endpoints that might handle adding sections to courses
-    try:
-        # Try the course/{id}/sections endpoint
-        data = {
-            "section_id": section_id,
-            "order_index": order_index
-        }
-        response = requests.post(f"{BASE_URL}/courses/{course_id}/sections", json=data, headers=headers)
-        response.raise_for_status()
-    except requests.exceptions.HTTPError:
+    # Try the different endpoints that might handle adding sections to courses
+    for variant in _ADD_SECTION_VARIANTS:
+        response = await variant(client, course_id, section_id, order_index)
         try:
-            # Try the course-sections endpoint with query parameters
-            response = requests.post(
-                f"{BASE_URL}/course-sections?course_id={course_id}&section_id={section_id}&order_index={order_index}", 
-                headers=headers
-            )
-            response.raise_for_status()
-        except requests.exceptions.HTTPError:
-            # Try the users/me/courses/{id}/sections endpoint as a last resort
-            data = {
-                "section_id": section_id,
-                "order_index": order_index
-            }
-            response = requests.post(f"{BASE_URL}/users/me/courses/{course_id}/sections", json=data, headers=headers)
             response.raise_for_status()
+        except httpx.HTTPStatusError:
+            if variant is _ADD_SECTION_VARIANTS[-1]:
+                raise
+            continue
+        _ENDPOINT_CACHE["add_section_to_course"] = variant
+        return
 
-def add_card_to_section(section_id: int, card_id: int, order_index: int) -> None:
+async def add_card_to_section(client: httpx.AsyncClient, section_id: int, card_id: int, order_index: int) -> None:
     """Add a card to a section"""
-    headers = get_auth_headers()
     data = {
         "card_id": card_id,
         "order_index": order_index,
@@ -216,277 +333,389 @@ def add_card_to_section(section_id: int, card_id: int, order_index: int) -> None
     
     # For user sections, we need to use the /users/me/sections/{section_id}/cards endpoint
     try:
-        print(f"Adding card {card_id} to section {section_id} at position {order_index}")
-        response = requests.post(
-            f"{BASE_URL}/users/me/sections/{section_id}/cards", 
-            json=data, 
-            headers=headers
+        logger.debug("Adding card %s to section %s at position %s", card_id, section_id, order_index)
+        response = await client.post(
+            f"{_URLS.user_sections}/{section_id}/cards", 
+            json=data
         )
         response.raise_for_status()
-        print(f"Successfully added card to section")
-    except requests.exceptions.HTTPError as e:
-        print(f"Error adding card to section: {e}")
-        print(f"Response content: {e.response.text if hasattr(e, 'response') else 'No response'}")
+        logger.debug("Successfully added card to section")
+    except httpx.HTTPStatusError as e:
+        logger.warning("Error adding card to section: %s", e)
+        logger.debug("Response content: %s", e.response.text)
         raise
 
-def generate_card_content(keyword: str) -> Dict[str, Any]:
-    """Generate content for a card based on its keyword"""
+async def create_and_attach_card(
+    client: httpx.AsyncClient, section_id: int, keyword: str, order_index: int, level: str = None, focus: str = None
+) -> Dict[str, Any]:
+    """Create a card for the keyword and add it to the section at order_index"""
+    card = await create_card(client, generate_card_content(keyword, level=level, focus=focus))
+    await add_card_to_section(client, section_id, card["id"], order_index)
+    return card
+
+def generate_card_content(keyword: str, level: str = None, focus: str = None) -> Dict[str, Any]:
+    """Generate content for a card based on its keyword; level/focus are drawn if not given"""
     # This would ideally call your AI service, but for testing we'll use templates
+    slug = keyword.lower().replace(' ', '-')
     return {
         "keyword": keyword,
         "explanation": f"This card explains the concept of {keyword} and its importance in the learning journey.",
         "resources": [
-            {"title": f"{keyword} Fundamentals", "url": f"https://example.com/{keyword.lower().replace(' ', '-')}"},
-            {"title": f"Advanced {keyword}", "url": f"https://advanced-learning.com/{keyword.lower().replace(' ', '-')}"}
+            {"title": f"{keyword} Fundamentals", "url": f"https://example.com/{slug}"},
+            {"title": f"Advanced {keyword}", "url": f"https://advanced-learning.com/{slug}"}
         ],
-        "level": random.choice(["beginner", "intermediate", "advanced"]),
-        "tags": [keyword.split()[0], "essential", random.choice(["practical", "theoretical", "foundational"])]
+        "level": level or random.choice(CARD_LEVELS),
+        "tags": [keyword.partition(' ')[0], "essential", focus or random.choice(CARD_FOCUSES)]
     }
 
-def get_learning_paths() -> List[Dict[str, Any]]:
+@ttl_cache(seconds=30)
+@disk_ttl_cache("learning_paths")
+async def get_learning_paths(client: httpx.AsyncClient) -> List[Dict[str, Any]]:
     """Get all existing learning paths"""
-    headers = get_auth_headers()
-    response = requests.get(f"{BASE_URL}/learning-paths", headers=headers)
+    response = await client.get(_URLS.learning_paths)
     response.raise_for_status()
     return response.json()
 
-def learning_path_exists(title: str) -> bool:
+def _titles_lower(items: List[Dict[str, Any]], key: str = "title") -> frozenset:
+    """Lowercased titles (or other key) of the given items, for O(1) membership checks"""
+    return frozenset(item.get(key, "").lower() for item in items)
+
+@ttl_cache(seconds=30)
+async def _learning_path_titles(client: httpx.AsyncClient) -> frozenset:
+    return _titles_lower(await get_learning_paths(client))
+
+async def learning_path_exists(client: httpx.AsyncClient, title: str) -> bool:
     """Check if a learning path with the given title already exists"""
-    existing_paths = get_learning_paths()
-    return any(path["title"].lower() == title.lower() for path in existing_paths)
+    return title.lower() in await _learning_path_titles(client)
 
-def get_courses() -> List[Dict[str, Any]]:
+@ttl_cache(seconds=30)
+@disk_ttl_cache("courses")
+async def get_courses(client: httpx.AsyncClient) -> List[Dict[str, Any]]:
     """Get all existing courses"""
-    headers = get_auth_headers()
-    response = requests.get(f"{BASE_URL}/courses", headers=headers)
+    response = await client.get(_URLS.courses)
     response.raise_for_status()
     return response.json()
 
-def course_exists(title: str) -> bool:
+@ttl_cache(seconds=30)
+async def _course_titles(client: httpx.AsyncClient) -> frozenset:
+    return _titles_lower(await get_courses(client))
+
+async def course_exists(client: httpx.AsyncClient, title: str) -> bool:
     """Check if a course with the given title already exists"""
-    existing_courses = get_courses()
-    return any(course["title"].lower() == title.lower() for course in existing_courses)
+    return title.lower() in await _course_titles(client)
 
-def get_sections() -> List[Dict[str, Any]]:
+@ttl_cache(seconds=30)
+@disk_ttl_cache("sections")
+async def get_sections(client: httpx.AsyncClient) -> List[Dict[str, Any]]:
     """Get all existing sections"""
-    headers = get_auth_headers()
     try:
-        response = requests.get(f"{BASE_URL}/sections", headers=headers)
+        response = await client.get(_URLS.sections)
         response.raise_for_status()
         return response.json()
-    except requests.exceptions.HTTPError as e:
-        print(f"Warning: Could not get sections: {e}")
+    except httpx.HTTPStatusError as e:
+        logger.warning("Could not get sections: %s", e)
         # Return empty list if we can't get sections
         return []
 
-def section_exists(title: str) -> bool:
+@ttl_cache(seconds=30)
+async def _section_titles(client: httpx.AsyncClient) -> frozenset:
+    return _titles_lower(await get_sections(client))
+
+async def section_exists(client: httpx.AsyncClient, title: str) -> bool:
     """Check if a section with the given title already exists"""
-    existing_sections = get_sections()
-    return any(section["title"].lower() == title.lower() for section in existing_sections)
+    return title.lower() in await _section_titles(client)
 
-def get_cards() -> List[Dict[str, Any]]:
+@ttl_cache(seconds=30)
+@disk_ttl_cache("cards")
+async def get_cards(client: httpx.AsyncClient) -> List[Dict[str, Any]]:
     """Get all existing cards"""
-    headers = get_auth_headers()
-    
     # Try different possible endpoints for cards
     possible_endpoints = [
-        f"{BASE_URL}/cards",           # If cards router is at /api/cards
+        _URLS.cards,                   # If cards router is at /api/cards
         "http://localhost:8000/cards", # If cards router is at /cards (without /api prefix)
         f"{BASE_URL}/api/cards",       # If cards router is at /api/api/cards (double prefix)
         f"{BASE_URL}/v1/cards"         # If cards router is at /api/v1/cards
     ]
     
+    cached = _ENDPOINT_CACHE.get("get_cards")
+    if cached:
+        try:
+            response = await client.get(cached)
+            response.raise_for_status()
+            return response.json()
+        except httpx.HTTPStatusError as e:
+            logger.warning("Could not get cards from %s: %s", cached, e)
+            return []
+        except httpx.TransportError:
+            _ENDPOINT_CACHE.pop("get_cards", None)
+            raise
+    
     for endpoint in possible_endpoints:
         try:
-            print(f"Trying to get cards from: {endpoint}")
-            response = requests.get(endpoint, headers=headers)
+            logger.debug("Trying to get cards from: %s", endpoint)
+            response = await client.get(endpoint)
             response.raise_for_status()
-            print(f"Successfully got cards from: {endpoint}")
+            logger.debug("Successfully got cards from: %s", endpoint)
+            _ENDPOINT_CACHE["get_cards"] = endpoint
             return response.json()
-        except requests.exceptions.HTTPError as e:
-            print(f"Warning: Could not get cards from {endpoint}: {e}")
+        except httpx.HTTPStatusError as e:
+            logger.debug("Could not get cards from %s: %s", endpoint, e)
             continue
     
     # If all endpoints fail, return empty list
-    print("All card endpoints failed, returning empty list")
+    logger.warning("All card endpoints failed, returning empty list")
     return []
 
-def card_exists(keyword: str) -> bool:
+@ttl_cache(seconds=30)
+async def _card_keywords(client: httpx.AsyncClient) -> frozenset:
+    return _titles_lower(await get_cards(client), key="keyword")
+
+async def card_exists(client: httpx.AsyncClient, keyword: str) -> bool:
     """Check if a card with the given keyword already exists"""
     try:
-        existing_cards = get_cards()
-        return any(card.get("keyword", "").lower() == keyword.lower() for card in existing_cards)
+        return keyword.lower() in await _card_keywords(client)
     except Exception as e:
-        print(f"Warning: Error checking if card exists: {e}")
+        logger.warning("Error checking if card exists: %s", e)
         # If we can't check, assume it doesn't exist
         return False
 
-def get_learning_path_details(learning_path_id: int) -> Dict[str, Any]:
+async def get_learning_path_details(client: httpx.AsyncClient, learning_path_id: int) -> Dict[str, Any]:
     """Get details of a specific learning path including its courses"""
-    headers = get_auth_headers()
-    response = requests.get(f"{BASE_URL}/learning-paths/{learning_path_id}", headers=headers)
+    response = await client.get(f"{_URLS.learning_paths}/{learning_path_id}")
     response.raise_for_status()
     return response.json()
 
-def get_course_details(course_id: int) -> Dict[str, Any]:
+async def get_course_details(client: httpx.AsyncClient, course_id: int) -> Dict[str, Any]:
     """Get details of a specific course including its sections"""
-    headers = get_auth_headers()
-    response = requests.get(f"{BASE_URL}/courses/{course_id}", headers=headers)
+    response = await client.get(f"{_URLS.courses}/{course_id}")
     response.raise_for_status()
     return response.json()
 
-def get_section_details(section_id: int) -> Dict[str, Any]:
+async def get_section_details(client: httpx.AsyncClient, section_id: int) -> Dict[str, Any]:
     """Get details of a specific section including its cards"""
-    headers = get_auth_headers()
-    response = requests.get(f"{BASE_URL}/sections/{section_id}", headers=headers)
+    response = await client.get(f"{_URLS.sections}/{section_id}")
     response.raise_for_status()
     return response.json()
 
-def main():
-    """Main function to generate all learning paths, courses, sections, and cards"""
-    created_paths = []
+async def _snapshot_state(client: httpx.AsyncClient) -> Dict[str, Any]:
+    """Fetch the current tree once and index it by lowercased title/keyword.
+
+    GET /learning-paths already embeds courses -> sections -> cards, so the
+    per-path/course/section detail GETs are not needed. The flat listings
+    back the "exists elsewhere" checks.
+    """
+    paths, course_titles, section_titles, card_keywords = await asyncio.gather(
+        get_learning_paths(client),
+        _course_titles(client),
+        _section_titles(client),
+        _card_keywords(client),
+    )
+    snapshot = {
+        "paths": {},
+        "courses_by_path": {},
+        "sections_by_course": {},
+        "cards_by_section": {},
+        "course_titles": set(course_titles),
+        "section_titles": set(section_titles),
+        "card_keywords": set(card_keywords),
+    }
+    for path in paths:
+        snapshot["paths"][path["title"].lower()] = path
+        courses = snapshot["courses_by_path"].setdefault(path["id"], {})
+        for course in path.get("courses") or []:
+            courses[course["title"].lower()] = course
+            sections = snapshot["sections_by_course"].setdefault(course["id"], {})
+            for section in course.get("sections") or []:
+                sections[section["title"].lower()] = section
+                snapshot["cards_by_section"][section["id"]] = {
+                    c["keyword"].lower() for c in section.get("cards") or [] if c.get("keyword")
+                }
+    return snapshot
+
+async def process_section(ctx: Dict[str, Any], i: int, j: int, k: int, course: Dict[str, Any], course_data: Dict[str, Any], section_template: Dict[str, Any]) -> None:
+    """Create (or reuse) one section of a course and fan out its cards"""
+    client, snapshot, draws = ctx["client"], ctx["snapshot"], ctx["draws"]
+    existing_sections = snapshot["sections_by_course"].setdefault(course["id"], {})
+    section_title = f"{section_template['title']} for {course_data['title']}"
     
-    # Add some debug prints to understand the structure
-    print(f"Length of CARD_KEYWORDS_BY_PATH: {len(CARD_KEYWORDS_BY_PATH)}")
+    # Check if section already exists in this course
+    existing_section = existing_sections.get(section_title.lower())
+    if existing_section:
+        print(f"    Section already exists in this course: {section_title} - checking its contents")
+        section = existing_section
+    else:
+        # Check if section exists elsewhere
+        if section_title.lower() in snapshot["section_titles"]:
+            print(f"    Section exists elsewhere: {section_title} - skipping")
+            return
+            
+    print(f"    Creating section: {section_title}")
+    # Customize section title for the course
+    section_data = {
+        "title": section_title,
+        "description": section_template['description'],
+        "order_index": k,
+        "estimated_days": draws["section_days"][i, j, k]
+    }
     
-    for i, path in enumerate(CARD_KEYWORDS_BY_PATH):
-        if i < len(CARD_KEYWORDS_BY_PATH):
-            for j, course in enumerate(path):
-                if j < len(path):
-                    for k, section in enumerate(course):
-                        if k < len(course):
-                            # Only proceed if all indices are valid
-                            for l, keyword in enumerate(CARD_KEYWORDS_BY_PATH[i][j][k]):
-                                # Original code continues here
-                                pass
-        else:
-            print(f"  Warning: Trying to access course {j} but path only has {len(path)} courses")
+    # Claim the title before awaiting so concurrent branches see it as taken
+    snapshot["section_titles"].add(section_title.lower())
+    try:
+        # Create section directly with course association
+        section = await create_section(client, section_data, course_id=course["id"])
+    except httpx.HTTPStatusError as e:
+        snapshot["section_titles"].discard(section_title.lower())
+        print(f"    Error creating section: {e}")
+        return
+    existing_sections[section_title.lower()] = section
     
-    # Create learning paths
-    for i, path_data in enumerate(LEARNING_PATHS):
-        existing_path = None
-        
-        # Check if learning path with this title already exists
-        existing_paths = get_learning_paths()
-        for path in existing_paths:
-            if path["title"].lower() == path_data['title'].lower():
-                existing_path = path
-                print(f"Learning path already exists: {path_data['title']} - checking its contents")
-                break
-                
-        if existing_path:
-            # Learning path exists, get its details
-            path_details = get_learning_path_details(existing_path["id"])
-            path = existing_path
-        else:
-            # Create new learning path
-            print(f"Creating learning path: {path_data['title']}")
-            path = create_learning_path(path_data)
-            created_paths.append(path)
-        
-        # Get existing courses for this path
-        existing_courses = path_details.get("courses", []) if existing_path else []
-        existing_course_titles = [c["title"].lower() for c in existing_courses]
+    # Get existing cards for this section
+    existing_card_keywords = snapshot["cards_by_section"].setdefault(section["id"], set())
+    
+    # Create cards for this section; cards are independent, so the
+    # create/attach round-trips run concurrently, bounded by a semaphore
+    pending = []
+    for l, keyword in enumerate(CARD_KEYWORDS_BY_PATH[i][j][k]):
+        # Check if card already exists in this section
+        if keyword.lower() in existing_card_keywords:
+            print(f"      Card already exists in this section: {keyword} - skipping")
+            continue
         
-        # Create courses for this path
-        for j, course_data in enumerate(COURSES_BY_PATH[i]):
-            # Check if course already exists in this learning path
-            if course_data['title'].lower() in existing_course_titles:
-                print(f"  Course already exists in this path: {course_data['title']} - checking its contents")
-                # Find the existing course
-                existing_course = next(c for c in existing_courses if c["title"].lower() == course_data['title'].lower())
-                course = existing_course
-            else:
-                # Check if course exists elsewhere
-                if course_exists(course_data['title']):
-                    print(f"  Course exists elsewhere: {course_data['title']} - skipping")
-                    continue
-                    
-                print(f"  Creating course: {course_data['title']}")
-                course_data["estimated_days"] = random.randint(5, 10)
-                course = create_course(course_data)
-                
-                # Add course to learning path
-                add_course_to_learning_path(path["id"], course["id"], j)
+        # Check if card exists elsewhere
+        if keyword.lower() in snapshot["card_keywords"]:
+            print(f"      Card exists elsewhere: {keyword} - skipping")
+            continue
             
-            # Get existing sections for this course
-            course_details = get_course_details(course["id"])
-            existing_sections = course_details.get("sections", [])
-            existing_section_titles = [s["title"].lower() for s in existing_sections]
+        print(f"      Creating card: {keyword}")
+        existing_card_keywords.add(keyword.lower())
+        snapshot["card_keywords"].add(keyword.lower())
+        pending.append((l, keyword, draws["card_levels"][i, j, k, l], draws["card_focuses"][i, j, k, l]))
+    
+    async def _create(l: int, keyword: str, level: str, focus: str) -> None:
+        async with ctx["card_semaphore"]:
+            try:
+                await create_and_attach_card(client, section["id"], keyword, l, level=level, focus=focus)
+            except httpx.HTTPStatusError as e:
+                print(f"      Error creating card {keyword}: {e}")
+    
+    await asyncio.gather(*(_create(*args) for args in pending))
+
+async def process_course(ctx: Dict[str, Any], i: int, j: int, path: Dict[str, Any], course_data: Dict[str, Any]) -> None:
+    """Create (or reuse) one course of a path and fan out its sections"""
+    client, snapshot, draws = ctx["client"], ctx["snapshot"], ctx["draws"]
+    existing_courses = snapshot["courses_by_path"].setdefault(path["id"], {})
+    
+    # Check if course already exists in this learning path
+    existing_course = existing_courses.get(course_data['title'].lower())
+    if existing_course:
+        print(f"  Course already exists in this path: {course_data['title']} - checking its contents")
+        course = existing_course
+    else:
+        # Check if course exists elsewhere
+        if course_data['title'].lower() in snapshot["course_titles"]:
+            print(f"  Course exists elsewhere: {course_data['title']} - skipping")
+            return
             
-            # Create sections for this course
-            for k, section_template in enumerate(SECTIONS_TEMPLATE):
-                section_title = f"{section_template['title']} for {course_data['title']}"
-                
-                # Check if section already exists in this course
-                if section_title.lower() in existing_section_titles:
-                    print(f"    Section already exists in this course: {section_title} - checking its contents")
-                    # Find the existing section
-                    existing_section = next(s for s in existing_sections if s["title"].lower() == section_title.lower())
-                    section = existing_section
-                else:
-                    # Check if section exists elsewhere
-                    if section_exists(section_title):
-                        print(f"    Section exists elsewhere: {section_title} - skipping")
-                        continue
-                        
-                print(f"    Creating section: {section_title}")
-                # Customize section title for the course
-                section_data = {
-                    "title": section_title,
-                    "description": section_template['description'],
-                    "order_index": k,
-                    "estimated_days": random.randint(1, 3)
-                }
-                
-                try:
-                    # Create section directly with course association
-                    section = create_section(section_data, course_id=course["id"])
-                except requests.exceptions.HTTPError as e:
-                    print(f"    Error creating section: {e}")
-                    continue
-                
-                # Get existing cards for this section
-                try:
-                    section_details = get_section_details(section["id"])
-                    existing_cards = section_details.get("cards", [])
-                    existing_card_keywords = [c.get("keyword", "").lower() for c in existing_cards if "keyword" in c]
-                except requests.exceptions.HTTPError as e:
-                    print(f"    Warning: Could not get section details: {e}")
-                    existing_cards = []
-                    existing_card_keywords = []
-                
-                # Create cards for this section
-                for l, keyword in enumerate(CARD_KEYWORDS_BY_PATH[i][j][k]):
-                    # Check if card already exists in this section
-                    if keyword.lower() in existing_card_keywords:
-                        print(f"      Card already exists in this section: {keyword} - skipping")
-                        continue
-                    
-                    # Check if card exists elsewhere
-                    if card_exists(keyword):
-                        print(f"      Card exists elsewhere: {keyword} - skipping")
-                        continue
-                        
-                    print(f"      Creating card: {keyword}")
-                    card_data = generate_card_content(keyword)
-                    
-                    try:
-                        card = create_card(card_data)
-                    except requests.exceptions.HTTPError as e:
-                        print(f"      Error creating card: {e}")
-                        continue
-                    
-                    # Add card to section
-                    try:
-                        add_card_to_section(section["id"], card["id"], l)
-                    except requests.exceptions.HTTPError as e:
-                        print(f"      Error adding card to section: {e}")
-                        continue
+        print(f"  Creating course: {course_data['title']}")
+        course_data["estimated_days"] = draws["course_days"][i, j]
+        # Claim the title before awaiting so concurrent branches see it as taken
+        snapshot["course_titles"].add(course_data['title'].lower())
+        course = await create_course(client, course_data)
+        
+        # Add course to learning path
+        await add_course_to_learning_path(client, path["id"], course["id"], j)
+        existing_courses[course_data['title'].lower()] = course
+    
+    # Create sections for this course
+    await asyncio.gather(*(
+        process_section(ctx, i, j, k, course, course_data, section_template)
+        for k, section_template in enumerate(SECTIONS_TEMPLATE)
+    ))
+
+async def process_path(ctx: Dict[str, Any], i: int, path_data: Dict[str, Any]) -> None:
+    """Create (or reuse) one learning path and fan out its courses"""
+    client, snapshot = ctx["client"], ctx["snapshot"]
+    
+    # Check if learning path with this title already exists
+    existing_path = snapshot["paths"].get(path_data['title'].lower())
+            
+    if existing_path:
+        print(f"Learning path already exists: {path_data['title']} - checking its contents")
+        path = existing_path
+    else:
+        # Create new learning path
+        print(f"Creating learning path: {path_data['title']}")
+        path = await create_learning_path(client, path_data)
+        ctx["created_paths"].append(path)
+        snapshot["paths"][path["title"].lower()] = path
+    
+    # Create courses for this path
+    await asyncio.gather(*(
+        process_course(ctx, i, j, path, course_data)
+        for j, course_data in enumerate(COURSES_BY_PATH[i])
+    ))
+
+def _draw_template_values(rng: random.Random) -> Dict[str, Dict[tuple, Any]]:
+    """Draw every random template value, keyed by its (path, course, section, card) index.
+
+    Values are drawn in index order before any request is made, so the same
+    seed gives the same plan however the concurrent requests finish.
+    """
+    draws = {"course_days": {}, "section_days": {}, "card_levels": {}, "card_focuses": {}}
+    for i, courses in enumerate(COURSES_BY_PATH):
+        for j in range(len(courses)):
+            draws["course_days"][i, j] = rng.choice(range(5, 11))
+            for k in range(len(SECTIONS_TEMPLATE)):
+                draws["section_days"][i, j, k] = rng.choice(range(1, 4))
+                for l in range(len(CARD_KEYWORDS_BY_PATH[i][j][k])):
+                    draws["card_levels"][i, j, k, l] = rng.choice(CARD_LEVELS)
+                    draws["card_focuses"][i, j, k, l] = rng.choice(CARD_FOCUSES)
+    return draws
+
+async def amain():
+    """Generate all learning paths, courses, sections, and cards concurrently"""
+    # Draw all template randomness up front from one local generator
+    draws = _draw_template_values(random.Random(RANDOM_SEED))
+    
+    # One pooled client for the whole run; BearerLogin logs in on the first request
+    async with httpx.AsyncClient(
+        auth=BearerLogin(),
+        transport=httpx.AsyncHTTPTransport(limits=HTTP_LIMITS, retries=3),
+        timeout=30.0,
+    ) as client:
+        # Hydrate the existing tree once; every check below is an in-memory lookup
+        ctx = {
+            "client": client,
+            "snapshot": await _snapshot_state(client),
+            "draws": draws,
+            "card_semaphore": asyncio.Semaphore(CARD_CONCURRENCY),
+            "created_paths": [],
+        }
+        
+        # Create learning paths; independent branches run concurrently
+        await asyncio.gather(*(
+            process_path(ctx, i, path_data) for i, path_data in enumerate(LEARNING_PATHS)
+        ))
     
     print("\nSuccessfully processed learning paths with courses, sections, and cards!")
-    for path in created_paths:
+    for path in ctx["created_paths"]:
         print(f"- {path['title']} (ID: {path['id']})")
 
+def main():
+    """Main function to generate all learning paths, courses, sections, and cards"""
+    global DISK_CACHE_ENABLED
+    
+    parser = argparse.ArgumentParser(description='Generate learning paths, courses, sections and cards via the API')
+    parser.add_argument('--no-cache', action='store_true', help='Bypass the on-disk cache of API listings')
+    args = parser.parse_args()
+    
+    if args.no_cache:
+        DISK_CACHE_ENABLED = False
+    else:
+        os.makedirs(os.path.dirname(DISK_CACHE_PATH), exist_ok=True)
+    
+    asyncio.run(amain())
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    main()
@@ -1,17 +1,16 @@
 import os
 from dotenv import load_dotenv
-from fastapi import FastAPI, Request, Depends
-from fastapi.middleware.cors import CORSMiddleware
-from app.auth import get_user_from_request, get_current_active_user
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Depends
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
+from app.auth import get_user_from_principal, get_current_active_user
 from app.users.routes import router as users_router
 from app.auth.jwt import router as auth_router
 from app.cards.routes import router as cards_router
 from app.db import init_db
 from starlette.middleware.sessions import SessionMiddleware
-from starlette.responses import Response
 from fastapi.encoders import jsonable_encoder
-from datetime import datetime
-import json
 from fastapi.security import OAuth2PasswordBearer
 from app.users.schemas import UserResponse
 from app.models import User
@@ -41,14 +40,44 @@ log = logging.getLogger(__name__)
 
 # Load environment variables from .env file
 load_dotenv()
-print("Environment variables loaded:")
-print(f"MICROSOFT_CLIENT_ID: {'Yes' if os.getenv('MICROSOFT_CLIENT_ID') else 'No'}")
-print(f"GOOGLE_CLIENT_ID: {'Yes' if os.getenv('GOOGLE_CLIENT_ID') else 'No'}")
 
-app = FastAPI(title="Zero AI API")
+# Environment settings, read once at import time
+IS_PRODUCTION = os.getenv("ENVIRONMENT", "development").lower() == "production"
+BEHIND_PROXY = os.getenv("BEHIND_PROXY", "false").lower() == "true"
+SESSION_SECRET = os.getenv("SESSION_SECRET_KEY", "your-secret-key-here")
+HAS_SESSION_SECRET = bool(os.getenv("SESSION_SECRET_KEY"))
+FRONTEND_URL = os.getenv("FRONTEND_URL", "http://localhost:3000")
+ALLOWED_HOST = os.getenv("ALLOWED_HOST", "*")
+DEBUG_ENV = bool(os.getenv("DEBUG_ENV"))
+
+# Initialize database on startup. init_db() is a blocking call, so it runs
+# in the threadpool instead of stalling the event loop.
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if DEBUG_ENV:
+        log.info(
+            "Environment variables loaded: microsoft=%s google=%s",
+            bool(os.getenv("MICROSOFT_CLIENT_ID")),
+            bool(os.getenv("GOOGLE_CLIENT_ID")),
+        )
+    await run_in_threadpool(init_db)
+    log.info("Database initialized")
+    # Log the origins allowed for CORS
+    log.info(f"CORS allowed origins: {origins}")
+    yield
+
+# No interactive docs or OpenAPI schema in production
+app = FastAPI(
+    title="Zero AI API",
+    lifespan=lifespan,
+    openapi_url=None if IS_PRODUCTION else "/openapi.json",
+    docs_url=None if IS_PRODUCTION else "/docs",
+    redoc_url=None if IS_PRODUCTION else "/redoc",
+    # orjson serializes datetimes natively and is much faster than json.dumps
+    default_response_class=ORJSONResponse,
+)
 
 # Define CORS origins before using middleware
-frontend_url = os.getenv("FRONTEND_URL", "http://localhost:3000")
 origins = [
     "http://localhost",
     "http://localhost:3000",  # React frontend
@@ -56,72 +85,152 @@ origins = [
     "http://localhost:8080",  # Vue frontend
     "https://learnfromzero.app",  # Production domain
     "https://www.learnfromzero.app",  # www subdomain if used
-    frontend_url
+    FRONTEND_URL
 ]
 # Remove empty origins
 origins = [origin for origin in origins if origin]
 
-# OPTIONS preflight request handler middleware - this must be added FIRST
-@app.middleware("http")
-async def options_middleware(request: Request, call_next):
-    if request.method == "OPTIONS":
-        # For CORS preflight requests, return an empty 200 response with appropriate CORS headers
-        origin = request.headers.get("Origin", "")
-        path = request.url.path
-        
-        log.info(f"OPTIONS request received for path: {path}")
-        log.info(f"OPTIONS request headers: {request.headers}")
-        
-        # Create a response with appropriate CORS headers
-        response = Response(status_code=200)
-        
-        # Check if the origin is in the allowed origins
-        if origin in origins or "*" in origins:
-            response.headers["Access-Control-Allow-Origin"] = origin
-            log.info(f"Setting Access-Control-Allow-Origin: {origin}")
-        elif len(origins) > 0:
-            response.headers["Access-Control-Allow-Origin"] = origins[0]
-            log.info(f"Setting Access-Control-Allow-Origin: {origins[0]} (default)")
-            
-        # Add other CORS headers
-        response.headers["Access-Control-Allow-Methods"] = "GET, POST, PUT, DELETE, OPTIONS, PATCH"
-        response.headers["Access-Control-Allow-Headers"] = "Content-Type, Authorization, Accept, X-Requested-With, Origin, Access-Control-Request-Method, Access-Control-Request-Headers"
-        response.headers["Access-Control-Allow-Credentials"] = "true"
-        response.headers["Access-Control-Max-Age"] = "86400"  # Cache preflight response for 24 hours
-        
-        log.info(f"Handling OPTIONS preflight request for path: {path}, origin: {origin}")
-        log.info(f"Response headers: {response.headers}")
-        return response
-        
-    return await call_next(request)
+# Allowed origins as raw header bytes, so the middleware can match the
+# Origin header straight out of the ASGI scope without decoding it
+ALLOWED_ORIGINS = frozenset(origin.encode("latin-1") for origin in origins)
+DEFAULT_ORIGIN = origins[0].encode("latin-1") if origins else None
+
+# Static preflight headers, encoded once at import time. Only the
+# Access-Control-Allow-Origin header varies per request.
+PREFLIGHT_HEADERS_BASE = [
+    (b"access-control-allow-methods", b"GET, POST, PUT, DELETE, OPTIONS, PATCH"),
+    (b"access-control-allow-headers", b"Content-Type, Authorization, Accept, X-Requested-With, Origin, Access-Control-Request-Method, Access-Control-Request-Headers"),
+    (b"access-control-allow-credentials", b"true"),
+    (b"access-control-max-age", b"86400"),  # Cache preflight response for 24 hours
+    # The allowed origin is echoed back, so caches must key on it and on the
+    # request method/headers being preflighted
+    (b"vary", b"Origin, Access-Control-Request-Method, Access-Control-Request-Headers"),
+    (b"cache-control", b"public, max-age=86400"),
+    (b"content-length", b"0"),
+]
+
+# Complete preflight header lists per allowed origin, so answering a
+# preflight from a known origin is a single dict lookup
+PREFLIGHT_HEADERS = {
+    origin: [(b"access-control-allow-origin", origin), *PREFLIGHT_HEADERS_BASE]
+    for origin in ALLOWED_ORIGINS
+}
+DEFAULT_PREFLIGHT_HEADERS = (
+    PREFLIGHT_HEADERS[DEFAULT_ORIGIN] if DEFAULT_ORIGIN is not None else PREFLIGHT_HEADERS_BASE
+)
+
+# Preflights from origins that are not allowed get a 400, as Starlette's
+# CORSMiddleware returns, with no allow-origin header and nothing cacheable
+DISALLOWED_PREFLIGHT_BODY = b"Disallowed CORS origin"
+DISALLOWED_PREFLIGHT_HEADERS = [
+    (b"vary", b"Origin"),
+    (b"content-type", b"text/plain; charset=utf-8"),
+    (b"content-length", str(len(DISALLOWED_PREFLIGHT_BODY)).encode("latin-1")),
+]
+
+# Single CORS layer: answers preflights directly and adds CORS headers to
+# every other response. Registered last so it runs outermost.
+class CORSFastPath:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        origin = b""
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value
+                break
+
+        if scope["method"] == "OPTIONS":
+            # Preflights are answered here and never reach the inner app;
+            # the only awaits on this path are the two sends
+            if origin and origin not in ALLOWED_ORIGINS and b"*" not in ALLOWED_ORIGINS:
+                await send({"type": "http.response.start", "status": 400, "headers": DISALLOWED_PREFLIGHT_HEADERS})
+                await send({"type": "http.response.body", "body": DISALLOWED_PREFLIGHT_BODY})
+                return
+            await send({"type": "http.response.start", "status": 200, "headers": self.preflight_headers(scope, origin)})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        if origin not in ALLOWED_ORIGINS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                # Only add the CORS headers the response doesn't already carry
+                response_headers = list(message.get("headers", []))
+                present = {name.lower() for name, _ in response_headers}
+                if b"access-control-allow-origin" not in present:
+                    response_headers.append((b"access-control-allow-origin", origin))
+                if b"access-control-allow-credentials" not in present:
+                    response_headers.append((b"access-control-allow-credentials", b"true"))
+                if b"access-control-expose-headers" not in present:
+                    response_headers.append((b"access-control-expose-headers", b"Content-Length, Content-Type"))
+                # Add Origin to an existing Vary header instead of sending a second one
+                for i, (name, value) in enumerate(response_headers):
+                    if name.lower() == b"vary":
+                        if b"origin" not in value.lower():
+                            response_headers[i] = (name, value + b", Origin")
+                        break
+                else:
+                    response_headers.append((b"vary", b"Origin"))
+                message["headers"] = response_headers
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    def preflight_headers(self, scope, origin):
+        # For CORS preflight requests, the empty 200 response carries these CORS headers.
+        # Echo the origin back if it is allowed; requests without an Origin
+        # header get the default, as before.
+        response_headers = PREFLIGHT_HEADERS.get(origin)
+        if response_headers is None:
+            if b"*" in ALLOWED_ORIGINS:
+                response_headers = [(b"access-control-allow-origin", origin), *PREFLIGHT_HEADERS_BASE]
+            else:
+                response_headers = DEFAULT_PREFLIGHT_HEADERS
+
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Handling OPTIONS preflight request for path: %s origin: %s", scope["path"], origin)
+
+        return response_headers
+
+# Only the OAuth routes use request.session, so the signed session cookie is
+# decoded and re-signed for /oauth/ requests only instead of on every API call
+SESSION_PATH_PREFIX = "/oauth/"
+
+class OAuthSessionMiddleware:
+    def __init__(self, app, **session_options):
+        self.app = app
+        self.session_app = SessionMiddleware(app, **session_options)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith(SESSION_PATH_PREFIX):
+            await self.session_app(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
 
 # Add SessionMiddleware - this is required for OAuth
 app.add_middleware(
-    SessionMiddleware, 
-    secret_key=os.getenv("SESSION_SECRET_KEY", "your-secret-key-here"),  # Use environment variable
+    OAuthSessionMiddleware,
+    secret_key=SESSION_SECRET,  # Use environment variable
     max_age=14400,  # Extend session lifetime to 4 hours
     same_site="lax",  # Allow cross-site cookies for OAuth redirects
     session_cookie="zero_session",  # Use a custom cookie name
-    https_only=os.getenv("ENVIRONMENT", "development").lower() == "production",  # Secure in production
+    https_only=IS_PRODUCTION,  # Secure in production
 )
 
 # Log session configuration
-log.info(f"Session middleware configured with:")
-log.info(f"- Cookie name: zero_session")
-log.info(f"- Max age: 14400 seconds (4 hours)")
-log.info(f"- Same site: lax")
-log.info(f"- HTTPS only: {os.getenv('ENVIRONMENT', 'development').lower() == 'production'}")
-log.info(f"- Secret key available: {bool(os.getenv('SESSION_SECRET_KEY'))}")
-
-# Configure CORS - should be early in the middleware stack
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=origins,  # Use our defined origins list
-    allow_credentials=True,
-    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
-    allow_headers=["Content-Type", "Authorization", "Accept", "X-Requested-With", "Origin", "Access-Control-Request-Method", "Access-Control-Request-Headers"],
-    expose_headers=["Content-Length", "Content-Type"],
-    max_age=86400,  # Cache preflight response for 24 hours
+log.info(
+    "Session middleware configured: paths=%s* cookie=zero_session max_age=14400s same_site=lax https_only=%s secret_key_set=%s",
+    SESSION_PATH_PREFIX,
+    IS_PRODUCTION,
+    HAS_SESSION_SECRET,
 )
 
 # Security headers middleware for production
@@ -135,18 +244,17 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
         return response
 
 # Temporarily remove TrustedHostMiddleware to diagnose the issue
-# is_production = os.getenv("ENVIRONMENT", "development").lower() == "production"
-# if is_production:
+# if IS_PRODUCTION:
 #     app.add_middleware(SecurityHeadersMiddleware)
 #     
 #     # Only add HTTPS redirect in production and if not behind a proxy that terminates SSL
-#     if not os.getenv("BEHIND_PROXY", "false").lower() == "true":
+#     if not BEHIND_PROXY:
 #         app.add_middleware(HTTPSRedirectMiddleware)
 #     
 #     # Add trusted host middleware in production
 #     app.add_middleware(
 #         TrustedHostMiddleware, 
-#         allowed_hosts=["learnfromzero.app", "www.learnfromzero.app", os.getenv("ALLOWED_HOST", "*")]
+#         allowed_hosts=["learnfromzero.app", "www.learnfromzero.app", ALLOWED_HOST]
 #     )
 #     
 #     log.info("Production security middleware enabled")
@@ -154,42 +262,61 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
 #     # Allow localhost and 127.0.0.1 in development
 #     app.add_middleware(
 #         TrustedHostMiddleware, 
-#         allowed_hosts=["localhost", "127.0.0.1", os.getenv("ALLOWED_HOST", "*")]
+#         allowed_hosts=["localhost", "127.0.0.1", ALLOWED_HOST]
 #     )
 #     log.info("Development environment: TrustedHostMiddleware configured for localhost")
 
-# Add middleware for user authentication - should come AFTER OPTIONS middleware
-@app.middleware("http")
-async def add_user_to_request(request: Request, call_next):
-    # Skip authentication for OPTIONS requests
-    if request.method == "OPTIONS":
-        return await call_next(request)
-    
-    # Log the requested path to help with debugging
-    logging.info(f"Processing request for path: {request.url.path}, method: {request.method}")
-    
-    # Log Authorization header presence (not content for security)
-    auth_header = request.headers.get("Authorization")
-    logging.info(f"Authorization header present: {auth_header is not None}")
-    
-    user = get_user_from_request(request)
-    request.state.user = user
-    
-    # Log if user was found through the middleware
-    if user:
-        logging.info(f"User identified through middleware: {user.get('userId', 'unknown')}")
-    else:
-        logging.info("No user identified through middleware, will try JWT auth")
-    
-    response = await call_next(request)
-    
-    # If unauthorized response, log the path for debugging
-    if response.status_code == 401:
-        logging.warning(f"Unauthorized access to path: {request.url.path}")
-    
-    return response
-
-# Include routers - make sure the prefix is correct
+# Paths that never need a user on the request
+PUBLIC_PATHS = frozenset({"/", "/docs", "/openapi.json", "/redoc", "/favicon.ico", "/api/health"})
+PUBLIC_PREFIXES = ("/docs/", "/static/")
+
+# Add middleware for user authentication - runs inside CORSFastPath, so preflights never reach it
+class AuthMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        # Skip authentication for non-HTTP scopes and OPTIONS requests
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        if path in PUBLIC_PATHS or path.startswith(PUBLIC_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+
+        # Decode the principal straight from the raw header bytes; no Request
+        # or Headers object is built. request.state is a view over
+        # scope["state"], so downstream code keeps reading request.state.user.
+        principal = dict(scope["headers"]).get(b"x-ms-client-principal")
+        user = get_user_from_principal(principal)
+        scope.setdefault("state", {})["user"] = user
+
+        # Per-request diagnostics are debug-only; skip the work entirely otherwise
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Processing request for path: %s method: %s", path, scope["method"])
+            if user:
+                log.debug("User identified through middleware: %s", user.get("userId", "unknown"))
+            else:
+                log.debug("No user identified through middleware, will try JWT auth")
+
+        async def send_wrapper(message):
+            # If unauthorized response, log the path for debugging
+            if message["type"] == "http.response.start" and message["status"] == 401:
+                log.warning("Unauthorized access to path: %s", path)
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+app.add_middleware(AuthMiddleware)
+
+# CORS goes on last so it wraps everything, including preflights
+app.add_middleware(CORSFastPath)
+
+# Include routers - make sure the prefix is correct.
+# Routers go straight onto the app: include_router clones every route, so
+# nesting them under an intermediate APIRouter would clone each one twice.
 app.include_router(users_router, prefix="/api", tags=["users"])
 app.include_router(auth_router, prefix="/api", tags=["auth"])
 app.include_router(cards_router, prefix="/api", tags=["cards"])
@@ -207,23 +334,6 @@ app.include_router(user_daily_usage_router, prefix="/api", tags=["user_daily_usa
 app.include_router(planner_router, prefix="/api/ai", tags=["AI Planner"])
 app.include_router(learning_assistant_router, prefix="/api", tags=["learning_assistant"])
 app.include_router(app_routes, prefix="/api", tags=["app"])
-# Initialize database on startup
-@app.on_event("startup")
-def startup_db_client():
-    init_db()
-    log.info("Database initialized")
-    # Log the origins allowed for CORS
-    log.info(f"CORS allowed origins: {origins}")
-
-# Custom JSON encoder for datetime objects
-class CustomJSONEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, datetime):
-            return obj.isoformat()
-        return super().default(obj)
-
-# Set the custom encoder for FastAPI
-app.json_encoder = CustomJSONEncoder
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
@@ -246,6 +356,7 @@ Environment variables for production:
 
 1. ENVIRONMENT = "production"  
    - Enables production security middleware
+   - Disables /docs, /redoc and /openapi.json
 
 2. FRONTEND_URL = "https://learnfromzero.app"  
    - Your frontend URL for CORS
@@ -267,4 +378,14 @@ Environment variables for production:
 
 8. PORT = [port number]  
    - The port your app should listen on
+
+9. DEBUG_ENV = "1" (optional)  
+   - Logs at startup which OAuth client IDs are configured
+
+CDN / proxy caching:
+   - Preflight (OPTIONS) responses carry "Vary: Origin" and
+     "Cache-Control: public, max-age=86400". If a CDN sits in front of the API,
+     forward the Origin, Access-Control-Request-Method and
+     Access-Control-Request-Headers headers and vary on Origin so it can serve
+     preflights without reaching the app.
 """
@@ -8,19 +8,26 @@ It can also automatically fix invalid resources if requested.
 """
 
 import os
+import re
 import sys
 import json
+import orjson
 import asyncio
 import argparse
-from typing import Dict, List, Optional, Any, Tuple
+import hashlib
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Any, Tuple
+from itertools import islice
 import logging
+import httpx
 
 # Add the root directory to path to allow importing from app
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.db import SessionLocal
-from app.models import Card
-from app.utils.url_validator import is_valid_url, get_valid_resources
+# app modules (database engine, models, validators) are imported inside the
+# functions that use them, so that --help does not pay for loading them
 from sqlalchemy.orm import Session
 
 # Configure logging
@@ -34,14 +41,133 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def get_all_cards(db: Session, limit: Optional[int] = None) -> List[Card]:
-    """Get all cards from the database, optionally limited"""
-    query = db.query(Card)
-    if limit:
-        query = query.limit(limit)
-    return query.all()
+# Cheap shape check run before any network request: http(s) scheme, a host,
+# and no whitespace
+_URL_RE = re.compile(r'^https?://[^\s/$.?#]\S*$', re.IGNORECASE)
 
-async def validate_card_resources(card: Card) -> Tuple[bool, List[Dict[str, str]], List[Dict[str, str]]]:
+# Maximum number of cards whose resources are checked or fixed at the same time
+VALIDATION_CONCURRENCY = 50
+
+# Number of cards read from the database and validated per page
+CARD_BATCH_SIZE = 500
+
+# Number of fixed cards saved per UPDATE/commit
+FIX_COMMIT_BATCH_SIZE = 200
+
+# Default cap on resource searches started per second during fixes,
+# to stay inside the Google Search API quota
+DEFAULT_SEARCH_RPS = 10
+
+# Progress file used to resume an interrupted audit
+AUDIT_STATE_FILE = 'audit_state.json'
+
+# Cards whose resources are unchanged since they last passed are not
+# re-checked for this long (seconds); the cache keeps at most this many cards
+SIGNATURE_CACHE_TTL = 7 * 24 * 3600
+SIGNATURE_CACHE_MAXSIZE = 100_000
+
+class AuditCard(NamedTuple):
+    """The card columns the audit works on, with resources already parsed"""
+    id: int
+    keyword: str
+    question: str
+    resources: List[Dict[str, Any]]
+
+class RateLimiter:
+    """Allow at most rps acquisitions in any one-second window"""
+    
+    def __init__(self, rps: int):
+        self._sem = asyncio.Semaphore(rps)
+    
+    async def acquire(self) -> None:
+        await self._sem.acquire()
+        # The slot is handed back a second later rather than when the call ends
+        asyncio.get_running_loop().call_later(1.0, self._sem.release)
+
+def iter_cards(
+    db: Session,
+    page: int = CARD_BATCH_SIZE,
+    start_id: int = 0,
+    hard_limit: Optional[int] = None
+) -> Iterator[AuditCard]:
+    """
+    Iterate over the card columns the audit needs, in ID order
+    
+    Cards are read with keyset pagination (WHERE id > last_id ORDER BY id),
+    so every page costs the same no matter how far into the table it is.
+    Each card's resources are normalized to a list once, here.
+    """
+    from app.models import Card
+    from app.utils.url_validator import normalize_resources
+    
+    last_id = start_id
+    remaining = hard_limit
+    while remaining is None or remaining > 0:
+        page_size = page if remaining is None else min(page, remaining)
+        rows = db.query(Card.id, Card.keyword, Card.question, Card.resources).filter(
+            Card.id > last_id
+        ).order_by(Card.id).limit(page_size).all()
+        
+        for row in rows:
+            yield AuditCard(row.id, row.keyword, row.question, normalize_resources(row.resources))
+        
+        if len(rows) < page_size:
+            break
+        last_id = rows[-1].id
+        if remaining is not None:
+            remaining -= len(rows)
+
+def load_checkpoint() -> int:
+    """Get the last card ID recorded by an interrupted audit, or 0"""
+    if not os.path.exists(AUDIT_STATE_FILE):
+        return 0
+    with open(AUDIT_STATE_FILE) as f:
+        return json.load(f).get("last_id", 0)
+
+def save_checkpoint(last_id: int) -> None:
+    """Record the last audited card ID so the audit can be resumed"""
+    with open(AUDIT_STATE_FILE, 'w') as f:
+        json.dump({"last_id": last_id}, f)
+
+def resources_signature(resources: List[Dict[str, Any]]) -> str:
+    """Hash a card's resources so unchanged cards can be recognized"""
+    return hashlib.blake2b(orjson.dumps(resources), digest_size=16).hexdigest()
+
+def load_signature_cache(path: str) -> OrderedDict:
+    """
+    Load the signatures of cards that passed earlier audits
+    
+    The cache maps card ID (as a string) to [signature, last_ok_ts], with
+    the least recently used cards first.
+    """
+    if not os.path.exists(path):
+        return OrderedDict()
+    try:
+        with open(path, 'rb') as f:
+            return OrderedDict(orjson.loads(f.read()))
+    except (OSError, orjson.JSONDecodeError) as e:
+        logger.warning(f"Ignoring unreadable signature cache {path}: {e}")
+        return OrderedDict()
+
+def save_signature_cache(path: str, cache: OrderedDict) -> None:
+    """Trim the cache to SIGNATURE_CACHE_MAXSIZE and atomically rewrite the file"""
+    while len(cache) > SIGNATURE_CACHE_MAXSIZE:
+        cache.popitem(last=False)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(orjson.dumps(cache))
+    os.replace(tmp_path, path)
+
+def _batched(iterable: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Split an iterable into lists of at most size items"""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+async def validate_card_resources(
+    card: AuditCard,
+    client: httpx.AsyncClient
+) -> Tuple[bool, List[Dict[str, str]], List[Dict[str, str]]]:
     """
     Validate the resources for a single card
     
@@ -51,32 +177,36 @@ async def validate_card_resources(card: Card) -> Tuple[bool, List[Dict[str, str]
         - List of valid resources
         - List of invalid resources
     """
-    if not card.resources:
+    from app.utils.url_validator import is_valid_url_async
+    
+    resources = card.resources
+    if not resources:
         return True, [], []
     
     try:
-        # Parse resources from JSON if stored as string
-        resources = card.resources
-        if isinstance(resources, str):
-            resources = json.loads(resources)
-        
-        # Handle empty resources
-        if not resources:
-            return True, [], []
-        
         valid_resources = []
         invalid_resources = []
-        
+        # Resources grouped by URL, since generated cards often repeat a link
+        url_resources = {}
+        match_url = _URL_RE.match
         for resource in resources:
-            if isinstance(resource, dict) and 'url' in resource:
-                url = resource.get('url')
-                if url and is_valid_url(url):
-                    valid_resources.append(resource)
-                else:
-                    invalid_resources.append(resource)
-            else:
-                # Skip resources without URL
+            # Skip resources without URL
+            if not isinstance(resource, dict) or 'url' not in resource:
                 continue
+            url = resource['url']
+            # Obviously malformed URLs are rejected without a request
+            if isinstance(url, str) and match_url(url):
+                url_resources.setdefault(url, []).append(resource)
+            else:
+                invalid_resources.append(resource)
+        
+        # Check each distinct URL once, all at once over the shared client
+        checks = await asyncio.gather(*(
+            is_valid_url_async(client, url) for url in url_resources
+        ))
+        
+        for group, is_valid in zip(url_resources.values(), checks):
+            (valid_resources if is_valid else invalid_resources).extend(group)
         
         all_valid = len(invalid_resources) == 0
         return all_valid, valid_resources, invalid_resources
@@ -86,19 +216,24 @@ async def validate_card_resources(card: Card) -> Tuple[bool, List[Dict[str, str]
         return False, [], []
 
 async def fix_card_resources(
-    db: Session, 
-    card: Card, 
+    card: AuditCard, 
     invalid_resources: List[Dict[str, str]],
-    valid_resources: List[Dict[str, str]] = None
+    valid_resources: List[Dict[str, str]] = None,
+    limiter: Optional[RateLimiter] = None
 ) -> Tuple[bool, List[Dict[str, str]]]:
     """
-    Fix invalid resources for a card using Google Search
+    Find replacement resources for a card using Google Search
+    
+    The card is not written here; the caller saves fixes in batches
+    with flush_fixes.
     
     Returns:
         Tuple containing:
         - Whether the fix was successful
         - The new resources list
     """
+    from app.utils.url_validator import get_valid_resources
+    
     try:
         # Create search context from card data
         context = f"{card.keyword} {card.question}"
@@ -110,33 +245,124 @@ async def fix_card_resources(
             # or potentially fixable with slight URL modifications
             existing_resources.extend(invalid_resources)
         
-        enhanced_resources = get_valid_resources(
+        if limiter:
+            await limiter.acquire()
+        enhanced_resources = await asyncio.to_thread(
+            get_valid_resources,
             keyword=card.keyword,
             context=context,
             existing_resources=existing_resources
         )
         
-        # Update the card in the database
-        if isinstance(card.resources, str):
-            # If resources were stored as JSON string, convert back
-            card.resources = json.dumps(enhanced_resources)
-        else:
-            card.resources = enhanced_resources
-        
-        db.add(card)
-        db.commit()
-        
         return True, enhanced_resources
     
     except Exception as e:
         logger.error(f"Error fixing resources for card ID {card.id}: {e}")
-        db.rollback()
         return False, []
 
+def flush_fixes(
+    db: Session,
+    pending: List[Tuple[Dict[str, Any], Dict[str, Any]]],
+    fixed_cards: List[Dict[str, Any]],
+    failed_fixes: List[int],
+    on_result: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> None:
+    """
+    Save a batch of fixed cards with one bulk UPDATE and one commit
+    
+    pending holds (report entry, update mapping) pairs and is cleared
+    afterwards. If the batch fails, every card in it is recorded as failed.
+    """
+    from app.models import Card
+    
+    if not pending:
+        return
+    try:
+        db.bulk_update_mappings(Card, [mapping for _, mapping in pending])
+        db.commit()
+        fixed_cards.extend(entry for entry, _ in pending)
+        logger.info(f"Saved fixed resources for {len(pending)} cards")
+        if on_result:
+            for entry, _ in pending:
+                on_result({"card_id": entry["id"], "status": "fixed", "new_resources": entry["new_resources"]})
+    except Exception as e:
+        db.rollback()
+        failed_fixes.extend(mapping["id"] for _, mapping in pending)
+        logger.error(f"Failed to save fixed resources for {len(pending)} cards: {e}")
+        if on_result:
+            for _, mapping in pending:
+                on_result({"card_id": mapping["id"], "status": "fix_failed"})
+    pending.clear()
+
+async def _bounded_validate(card: AuditCard, client: httpx.AsyncClient, sem: asyncio.Semaphore):
+    """Validate a card's resources once a concurrency slot is free"""
+    async with sem:
+        return await validate_card_resources(card, client)
+
+async def _bounded_fix(
+    card: AuditCard,
+    invalid_resources: List[Dict[str, str]],
+    valid_resources: List[Dict[str, str]],
+    sem: asyncio.Semaphore,
+    limiter: RateLimiter
+):
+    """Fix a card's resources once a concurrency slot is free"""
+    async with sem:
+        return await fix_card_resources(card, invalid_resources, valid_resources, limiter)
+
+async def _fix_cards(
+    db: Session,
+    cards_to_fix: List[Tuple[AuditCard, List[Dict[str, str]], List[Dict[str, str]]]],
+    sem: asyncio.Semaphore,
+    limiter: RateLimiter,
+    fixed_cards: List[Dict[str, Any]],
+    failed_fixes: List[int],
+    on_result: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> None:
+    """Find new resources for a page of invalid cards and save them before returning"""
+    pending_fixes = []
+    # Resource searches are network-bound too, so overlap them the same way
+    fix_results = await asyncio.gather(
+        *(_bounded_fix(card, invalid_resources, valid_resources, sem, limiter)
+          for card, invalid_resources, valid_resources in cards_to_fix),
+        return_exceptions=True
+    )
+    
+    for (card, _, _), fix_result in zip(cards_to_fix, fix_results):
+        if isinstance(fix_result, Exception):
+            logger.error(f"Error fixing resources for card ID {card.id}: {fix_result}")
+            fix_result = (False, [])
+        success, new_resources = fix_result
+        if success:
+            pending_fixes.append((
+                {
+                    "id": card.id,
+                    "keyword": card.keyword,
+                    "original_resources": card.resources,
+                    "new_resources": new_resources
+                },
+                {"id": card.id, "resources": new_resources}
+            ))
+            logger.info(f"Found new resources for card ID {card.id}")
+        else:
+            failed_fixes.append(card.id)
+            logger.error(f"Failed to fix resources for card ID {card.id}")
+            if on_result:
+                on_result({"card_id": card.id, "status": "fix_failed"})
+        
+        if len(pending_fixes) >= FIX_COMMIT_BATCH_SIZE:
+            flush_fixes(db, pending_fixes, fixed_cards, failed_fixes, on_result)
+    
+    flush_fixes(db, pending_fixes, fixed_cards, failed_fixes, on_result)
+
 async def audit_resources(
     limit: Optional[int] = None, 
     fix: bool = False,
-    summary_only: bool = False
+    summary_only: bool = False,
+    resume: bool = False,
+    cache_file: Optional[str] = None,
+    on_result: Optional[Callable[[Dict[str, Any]], None]] = None,
+    search_rps: int = DEFAULT_SEARCH_RPS
 ) -> Dict[str, Any]:
     """
     Audit all card resources in the database
@@ -144,56 +370,128 @@ async def audit_resources(
     Args:
         limit: Maximum number of cards to check
         fix: Whether to automatically fix invalid resources
-        summary_only: Whether to only return summary statistics
+        summary_only: Whether to only return summary statistics; per-card
+            lists are then not kept in memory
+        resume: Whether to continue after the last card of an interrupted audit
+        cache_file: Signature cache used to skip cards unchanged since they last passed
+        on_result: Called with a record for each card as soon as it is classified
+        search_rps: Maximum resource searches started per second while fixing
     
     Returns:
         Dictionary with audit results
     """
+    from app.db import SessionLocal
+    from app.utils.url_validator import create_validation_client
+    
     db = SessionLocal()
     try:
-        cards = get_all_cards(db, limit)
-        logger.info(f"Found {len(cards)} cards to audit")
-        
         valid_cards = []
         invalid_cards = []
         fixed_cards = []
         failed_fixes = []
+        total_cards = 0
+        total_valid = 0
+        total_invalid = 0
+        skipped_cards = 0
+        signature_cache = load_signature_cache(cache_file) if cache_file else None
         
-        for card in cards:
-            all_valid, valid_resources, invalid_resources = await validate_card_resources(card)
+        # Cards are checked concurrently; the semaphore caps how many
+        # cards have URL requests in flight at once
+        sem = asyncio.Semaphore(VALIDATION_CONCURRENCY)
+        limiter = RateLimiter(search_rps) if fix else None
+        async with create_validation_client() as client:
+            start_id = load_checkpoint() if resume else 0
+            if start_id:
+                logger.info(f"Resuming audit after card ID {start_id}")
             
-            if all_valid:
-                valid_cards.append(card.id)
-                logger.debug(f"Card ID {card.id} has valid resources")
-            else:
-                logger.info(f"Card ID {card.id} has {len(invalid_resources)} invalid resources")
-                invalid_cards.append({
-                    "id": card.id,
-                    "keyword": card.keyword,
-                    "valid_resources": valid_resources,
-                    "invalid_resources": invalid_resources
-                })
+            for cards in _batched(iter_cards(db, start_id=start_id, hard_limit=limit), CARD_BATCH_SIZE):
+                total_cards += len(cards)
+                cards_to_fix = []
+                
+                to_validate = cards
+                if signature_cache is not None:
+                    now = time.time()
+                    signatures = {card.id: resources_signature(card.resources) for card in cards}
+                    to_validate = []
+                    for card in cards:
+                        cached = signature_cache.get(str(card.id))
+                        if cached and cached[0] == signatures[card.id] and now - cached[1] < SIGNATURE_CACHE_TTL:
+                            # Unchanged since it last passed, so no requests are needed
+                            signature_cache.move_to_end(str(card.id))
+                            total_valid += 1
+                            skipped_cards += 1
+                            if not summary_only:
+                                valid_cards.append(card.id)
+                            if on_result:
+                                on_result({"card_id": card.id, "status": "valid", "cached": True})
+                        else:
+                            to_validate.append(card)
+                
+                results = await asyncio.gather(
+                    *(_bounded_validate(card, client, sem) for card in to_validate),
+                    return_exceptions=True
+                )
                 
-                if fix:
-                    success, new_resources = await fix_card_resources(
-                        db, card, invalid_resources, valid_resources
-                    )
-                    if success:
-                        fixed_cards.append({
-                            "id": card.id,
-                            "keyword": card.keyword,
-                            "original_resources": card.resources if isinstance(card.resources, list) else json.loads(card.resources) if isinstance(card.resources, str) else [],
-                            "new_resources": new_resources
-                        })
-                        logger.info(f"Successfully fixed resources for card ID {card.id}")
+                for card, result in zip(to_validate, results):
+                    if isinstance(result, Exception):
+                        logger.error(f"Error validating resources for card ID {card.id}: {result}")
+                        result = (False, [], [])
+                    all_valid, valid_resources, invalid_resources = result
+                    
+                    if signature_cache is not None:
+                        if all_valid:
+                            signature_cache[str(card.id)] = (signatures[card.id], now)
+                            signature_cache.move_to_end(str(card.id))
+                        else:
+                            signature_cache.pop(str(card.id), None)
+                    
+                    if all_valid:
+                        total_valid += 1
+                        if not summary_only:
+                            valid_cards.append(card.id)
+                        if on_result:
+                            on_result({"card_id": card.id, "status": "valid"})
+                        logger.debug(f"Card ID {card.id} has valid resources")
                     else:
-                        failed_fixes.append(card.id)
-                        logger.error(f"Failed to fix resources for card ID {card.id}")
+                        logger.info(f"Card ID {card.id} has {len(invalid_resources)} invalid resources")
+                        total_invalid += 1
+                        if not summary_only:
+                            invalid_cards.append({
+                                "id": card.id,
+                                "keyword": card.keyword,
+                                "valid_resources": valid_resources,
+                                "invalid_resources": invalid_resources
+                            })
+                        if on_result:
+                            on_result({
+                                "card_id": card.id,
+                                "status": "invalid",
+                                "keyword": card.keyword,
+                                "valid_resources": valid_resources,
+                                "invalid_resources": invalid_resources
+                            })
+                        if fix:
+                            cards_to_fix.append((card, invalid_resources, valid_resources))
+                
+                # Fix this page before checkpointing it, so a resumed --fix run
+                # never skips invalid cards that were found but not yet fixed
+                if cards_to_fix:
+                    await _fix_cards(db, cards_to_fix, sem, limiter, fixed_cards, failed_fixes, on_result)
+                
+                save_checkpoint(cards[-1].id)
+        
+        logger.info(f"Audited {total_cards} cards")
+        if signature_cache is not None:
+            logger.info(f"Skipped {skipped_cards} cards unchanged since they last passed")
+            save_signature_cache(cache_file, signature_cache)
+        if limit is not None and total_cards >= limit:
+            # Stopped by --limit, so keep the checkpoint for the next --resume
+            logger.info(f"Stopped after {limit} cards; use --resume to continue")
+        elif os.path.exists(AUDIT_STATE_FILE):
+            # The run got through every card, so a later --resume starts over
+            os.remove(AUDIT_STATE_FILE)
         
         # Prepare summary report
-        total_cards = len(cards)
-        total_valid = len(valid_cards)
-        total_invalid = len(invalid_cards)
         total_fixed = len(fixed_cards)
         total_failed_fixes = len(failed_fixes)
         
@@ -225,23 +523,55 @@ async def audit_resources(
     finally:
         db.close()
 
+def write_results(path: str, result: Dict[str, Any]) -> None:
+    """Write the audit results to a JSON file"""
+    with open(path, 'wb') as f:
+        f.write(orjson.dumps(result, option=orjson.OPT_INDENT_2))
+
 async def main():
     parser = argparse.ArgumentParser(description="Audit and fix card resources")
     parser.add_argument("--limit", type=int, help="Maximum number of cards to check")
     parser.add_argument("--fix", action="store_true", help="Automatically fix invalid resources")
     parser.add_argument("--summary", action="store_true", help="Show only summary statistics")
     parser.add_argument("--output", help="Output file for the audit results")
+    parser.add_argument("--output-ndjson", help="Output file that receives one JSON line per card as it is audited")
+    parser.add_argument("--search-rps", type=int, default=DEFAULT_SEARCH_RPS, help=f"Maximum resource searches per second when fixing (default: {DEFAULT_SEARCH_RPS})")
+    parser.add_argument("--resume", action="store_true", help=f"Continue an interrupted audit from {AUDIT_STATE_FILE}")
+    parser.add_argument("--cache-file", help="Signature cache file (e.g. audit_cache.json) used to skip cards unchanged since they last passed")
 
     args = parser.parse_args()
     
+    # Resource searches run through asyncio.to_thread; the default executor is
+    # sized from the CPU count and would cap them well below the concurrency limit
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=VALIDATION_CONCURRENCY)
+    )
+    
+    ndjson_file = None
     try:
         logger.info("Starting card resources audit")
+        
+        on_result = None
+        if args.output_ndjson:
+            # Records are written as cards are classified, so the file never
+            # needs the whole report in memory
+            ndjson_file = open(args.output_ndjson, 'wb')
+            on_result = lambda record: ndjson_file.write(orjson.dumps(record) + b"\n")
+        
         result = await audit_resources(
             limit=args.limit,
             fix=args.fix,
-            summary_only=args.summary
+            summary_only=args.summary,
+            resume=args.resume,
+            cache_file=args.cache_file,
+            on_result=on_result,
+            search_rps=args.search_rps
         )
         
+        if ndjson_file:
+            ndjson_file.write(orjson.dumps({"summary": result["summary"]}) + b"\n")
+            print(f"\nPer-card audit results saved to {args.output_ndjson}")
+        
         # Print summary to console
         summary = result["summary"]
         print("\n===== Card Resources Audit Summary =====")
@@ -255,8 +585,8 @@ async def main():
         
         # Save to file if requested
         if args.output:
-            with open(args.output, 'w') as f:
-                json.dump(result, f, indent=2)
+            # Large reports are serialized and written off the event loop
+            await asyncio.to_thread(write_results, args.output, result)
             print(f"\nAudit results saved to {args.output}")
             
         logger.info("Card resources audit completed")
@@ -265,6 +595,9 @@ async def main():
         logger.error(f"Error during audit: {e}")
         print(f"Error: {e}")
         return 1
+    finally:
+        if ndjson_file:
+            ndjson_file.close()
     
     return 0
 
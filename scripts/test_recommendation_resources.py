@@ -9,18 +9,49 @@ by simulating card generation for a test learning path/section.
 import os
 import sys
 import asyncio
-import json
 import argparse
-from typing import Dict, List, Any
+from functools import lru_cache
+from typing import Dict, Iterable, List, Any
 
 # Add the root directory to path to allow importing from app
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.db import SessionLocal, Base, engine
 from app.services.learning_path_planner import LearningPathPlannerService
-from app.utils.url_validator import is_valid_url, get_valid_resources
+from app.utils.url_validator import get_valid_resources, create_validation_client, is_valid_url_async, normalize_resources
 from app.models import LearningPath, Course, CourseSection, Card
 
+# Maximum number of URLs checked at the same time
+URL_CHECK_CONCURRENCY = 50
+
+class MockCard:
+    """Card-like object returned by the mocked create_card"""
+    __slots__ = ('id', 'keyword', 'resources')
+    
+    def __init__(self, id, keyword, resources):
+        self.id = id
+        self.keyword = keyword
+        self.resources = resources
+
+@lru_cache(maxsize=1)
+def _get_service() -> LearningPathPlannerService:
+    """Create the planner service once and share it between tests"""
+    return LearningPathPlannerService()
+
+async def check_urls(urls: Iterable[str]) -> Dict[str, bool]:
+    """Check every distinct URL concurrently and map each one to whether it is valid"""
+    urls = list(dict.fromkeys(url for url in urls if url))
+    sem = asyncio.Semaphore(URL_CHECK_CONCURRENCY)
+    
+    async with create_validation_client() as client:
+        async def bounded_check(url: str) -> bool:
+            async with sem:
+                return await is_valid_url_async(client, url)
+        
+        results = await asyncio.gather(*(bounded_check(url) for url in urls))
+    
+    return dict(zip(urls, results))
+
 async def test_card_generation_with_resource_validation(
     topic: str, 
     num_cards: int = 2,
@@ -32,7 +63,7 @@ async def test_card_generation_with_resource_validation(
     print(f"\n=== Generating {num_cards} cards for topic: '{topic}' ===\n")
     
     # Initialize the service
-    service = LearningPathPlannerService()
+    service = _get_service()
     
     if not service.card_manager or not service.card_manager.card_generator:
         print("ERROR: Failed to initialize CardGenerator")
@@ -49,53 +80,63 @@ async def test_card_generation_with_resource_validation(
         
         print(f"✅ Generated {len(cards)} cards")
         
-        for i, card in enumerate(cards):
+        # Extract resources
+        card_resources = []
+        for card in cards:
+            resources = card.dict().get('resources') if hasattr(card, 'dict') else getattr(card, 'resources', None)
+            card_resources.append(normalize_resources(resources))
+        
+        # Validate and enhance every card's resources at once
+        print("\nValidating and enhancing resources...")
+        enhanced_resources = await asyncio.gather(*(
+            asyncio.to_thread(
+                get_valid_resources,
+                keyword=card.keyword,
+                context=topic,
+                existing_resources=resources
+            )
+            for card, resources in zip(cards, card_resources)
+        ))
+        
+        # Check all original and enhanced URLs in one concurrent batch
+        url_status = await check_urls(
+            resource.get('url')
+            for resources in card_resources + enhanced_resources
+            for resource in resources
+        )
+        
+        for i, (card, resources, validated_resources) in enumerate(zip(cards, card_resources, enhanced_resources)):
             print(f"\n--- Card {i+1}: {card.keyword} ---")
             
-            # Extract resources
-            resources = getattr(card, 'resources', [])
-            if hasattr(card, 'dict'):
-                card_dict = card.dict()
-                resources = card_dict.get('resources', [])
-            
             print(f"Original resources: {len(resources)}")
             
             # Print resource details
             if resources:
                 for j, resource in enumerate(resources):
-                    url = resource.get('url', 'No URL')
+                    url = resource.get('url')
                     title = resource.get('title', 'No Title')
-                    is_valid = is_valid_url(url) if url else False
+                    is_valid = url_status[url] if url else False
                     status = "✅ Valid" if is_valid else "❌ Invalid"
-                    print(f"  {j+1}. {status} - {title}: {url}")
+                    print(f"  {j+1}. {status} - {title}: {url or 'No URL'}")
             else:
                 print("  No resources found")
             
-            # Validate and enhance resources
-            print("\nValidating and enhancing resources...")
-            validated_resources = await asyncio.to_thread(
-                get_valid_resources,
-                keyword=card.keyword,
-                context=topic,
-                existing_resources=resources
-            )
-            
-            print(f"Enhanced resources: {len(validated_resources)}")
+            print(f"\nEnhanced resources: {len(validated_resources)}")
             
             # Print enhanced resource details
             if validated_resources:
                 for j, resource in enumerate(validated_resources):
-                    url = resource.get('url', 'No URL')
+                    url = resource.get('url')
                     title = resource.get('title', 'No Title')
-                    is_valid = is_valid_url(url) if url else False
+                    is_valid = url_status[url] if url else False
                     status = "✅ Valid" if is_valid else "❌ Invalid"
-                    print(f"  {j+1}. {status} - {title}: {url}")
+                    print(f"  {j+1}. {status} - {title}: {url or 'No URL'}")
             else:
                 print("  No enhanced resources found")
             
             # Compare
-            original_valid = sum(1 for r in resources if r.get('url') and is_valid_url(r.get('url')))
-            enhanced_valid = sum(1 for r in validated_resources if r.get('url') and is_valid_url(r.get('url')))
+            original_valid = sum(1 for r in resources if (url := r.get('url')) and url_status[url])
+            enhanced_valid = sum(1 for r in validated_resources if (url := r.get('url')) and url_status[url])
             
             print(f"\nValid URLs: {original_valid}/{len(resources)} original → {enhanced_valid}/{len(validated_resources)} enhanced")
             
@@ -138,7 +179,7 @@ async def test_path_structure_cards(num_cards_per_section: int = 2):
     }
     
     # Initialize the service
-    service = LearningPathPlannerService()
+    service = _get_service()
     
     if not service.card_manager or not service.card_manager.card_generator:
         print("ERROR: Failed to initialize CardGenerator")
@@ -161,13 +202,6 @@ async def test_path_structure_cards(num_cards_per_section: int = 2):
             card_dict = card_data.dict() if hasattr(card_data, 'dict') else card_data
             card_id = len(cards_created) + 1  # Dummy ID
             
-            # Create a Card-like object
-            class MockCard:
-                def __init__(self, id, keyword, resources):
-                    self.id = id
-                    self.keyword = keyword
-                    self.resources = resources
-            
             card = MockCard(
                 id=card_id,
                 keyword=card_dict.get('keyword', 'Unknown'),
@@ -201,16 +235,16 @@ async def test_path_structure_cards(num_cards_per_section: int = 2):
         total_resources = 0
         valid_resources = 0
         
-        for i, card in enumerate(cards_created):
-            resources = card.resources
-            if isinstance(resources, str):
-                try:
-                    resources = json.loads(resources)
-                except:
-                    resources = []
-            
+        card_resources = [normalize_resources(card.resources) for card in cards_created]
+        
+        # Check every card's URLs in one concurrent batch
+        url_status = await check_urls(
+            resource.get('url') for resources in card_resources for resource in resources
+        )
+        
+        for i, (card, resources) in enumerate(zip(cards_created, card_resources)):
             total_resources += len(resources)
-            valid_count = sum(1 for r in resources if r.get('url') and is_valid_url(r.get('url')))
+            valid_count = sum(1 for r in resources if (url := r.get('url')) and url_status[url])
             valid_resources += valid_count
             
             print(f"\nCard {i+1}: {card.keyword}")
@@ -218,11 +252,11 @@ async def test_path_structure_cards(num_cards_per_section: int = 2):
             
             # Print resource details
             for j, resource in enumerate(resources):
-                url = resource.get('url', 'No URL')
+                url = resource.get('url')
                 title = resource.get('title', 'No Title')
-                is_valid = is_valid_url(url) if url else False
+                is_valid = url_status[url] if url else False
                 status = "✅ Valid" if is_valid else "❌ Invalid"
-                print(f"  {j+1}. {status} - {title}: {url}")
+                print(f"  {j+1}. {status} - {title}: {url or 'No URL'}")
         
         # Restore original functions
         app.cards.crud.create_card = original_create_card
@@ -259,16 +293,20 @@ async def main():
     
     args = parser.parse_args()
     
-    if args.command == "card":
-        await test_card_generation_with_resource_validation(
-            topic=args.topic,
-            num_cards=args.num,
-            course_title=args.course
-        )
-    elif args.command == "path":
-        await test_path_structure_cards(args.num)
-    else:
-        parser.print_help()
+    try:
+        if args.command == "card":
+            await test_card_generation_with_resource_validation(
+                topic=args.topic,
+                num_cards=args.num,
+                course_title=args.course
+            )
+        elif args.command == "path":
+            await test_path_structure_cards(args.num)
+        else:
+            parser.print_help()
+    finally:
+        # Drop the cached service reference; nothing is closed here
+        _get_service.cache_clear()
 
 if __name__ == "__main__":
     asyncio.run(main()) 
\ No newline at end of file
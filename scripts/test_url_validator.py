@@ -17,11 +17,13 @@ from typing import Dict, List, Optional, Any
 # Add the root directory to path to allow importing from app
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.utils.url_validator import is_valid_url, search_google, get_valid_resources
-from app.services.ai_generator import generate_card_with_ai, get_card_generator_agent
+# app modules are imported inside the tests that use them, so that --help
+# and the lighter commands do not load the AI services
 
 async def test_url_validation(url: str) -> Dict[str, Any]:
     """Test if a specific URL is valid"""
+    from app.utils.url_validator import is_valid_url
+    
     is_valid = is_valid_url(url)
     return {
         "url": url,
@@ -31,6 +33,8 @@ async def test_url_validation(url: str) -> Dict[str, Any]:
 
 async def test_google_search(query: str, num_results: int = 3) -> Dict[str, Any]:
     """Test Google Search with a specific query"""
+    from app.utils.url_validator import search_google
+    
     results = search_google(query, num_results)
     return {
         "query": query,
@@ -45,6 +49,8 @@ async def test_resource_enhancement(
     resources: Optional[List[Dict[str, str]]] = None
 ) -> Dict[str, Any]:
     """Test resource enhancement with existing and new resources"""
+    from app.utils.url_validator import get_valid_resources
+    
     if resources is None:
         # Use some test resources with mix of valid and invalid URLs
         resources = [
@@ -70,6 +76,8 @@ async def test_resource_enhancement(
 
 async def test_card_generation(keyword: str, context: Optional[str] = None) -> Dict[str, Any]:
     """Test the full card generation process with URL validation"""
+    from app.services.ai_generator import get_card_generator_agent
+    
     try:
         card_generator = get_card_generator_agent()
         card_data = await card_generator.generate_card(
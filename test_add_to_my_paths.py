@@ -2,7 +2,10 @@
 import os
 import sys
 import json
+import atexit
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -19,11 +22,22 @@ if not token:
     print("Please set the TEST_USER_TOKEN environment variable with a valid JWT token")
     sys.exit(1)
 
-# Setup headers
-headers = {
+# One session for every request, so the connection to the API is reused
+# and the auth headers are set once
+SESSION = requests.Session()
+SESSION.headers.update({
     "Authorization": f"Bearer {token}",
     "Content-Type": "application/json"
-}
+})
+# Retries only apply to idempotent requests (GET), not the POSTs below
+adapter = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[502, 503, 504])
+)
+SESSION.mount("http://", adapter)
+SESSION.mount("https://", adapter)
+atexit.register(SESSION.close)
 
 def get_learning_path_recommendations():
     """Get learning path recommendations to test adding to my paths"""
@@ -34,7 +48,7 @@ def get_learning_path_recommendations():
         "limit": 3
     }
     
-    response = requests.post(url, headers=headers, json=data)
+    response = SESSION.post(url, json=data)
     
     if response.status_code == 200:
         return response.json()
@@ -46,7 +60,7 @@ def add_learning_path_to_my_paths(path_id):
     """Add a learning path to my collection"""
     url = f"{API_BASE_URL}/learning-paths/{path_id}/add-to-my-paths"
     
-    response = requests.post(url, headers=headers)
+    response = SESSION.post(url)
     
     if response.status_code == 200:
         return response.json()
@@ -58,7 +72,7 @@ def get_my_learning_paths():
     """Get my learning paths to verify the addition"""
     url = f"{API_BASE_URL}/learning-paths/user"
     
-    response = requests.get(url, headers=headers)
+    response = SESSION.get(url)
     
     if response.status_code == 200:
         return response.json()
@@ -101,14 +115,15 @@ def main():
         return
     
     # Check if our newly added path is in the list
-    found = False
+    # Index by title so the check is a single lookup; the first match wins
+    paths_by_title = {}
     for path in my_paths:
-        if path["learning_path"]["title"] == path_title:
-            found = True
-            print(f"Found learning path in my collection: {path['learning_path']['title']} (ID: {path['learning_path_id']})")
-            break
-    
-    if not found:
+        paths_by_title.setdefault(path["learning_path"]["title"], path)
+
+    found = paths_by_title.get(path_title)
+    if found:
+        print(f"Found learning path in my collection: {path_title} (ID: {found['learning_path_id']})")
+    else:
         print(f"Learning path {path_title} not found in my collection")
 
 if __name__ == "__main__":
@@ -9,12 +9,12 @@ Usage:
     python test_oauth_flow.py
 
 Requirements:
-    pip install requests
+    pip install httpx
 """
 
-import requests
+import asyncio
+import httpx
 import webbrowser
-import time
 import json
 from urllib.parse import parse_qs, urlparse
 
@@ -22,37 +22,53 @@ from urllib.parse import parse_qs, urlparse
 BASE_URL = "http://localhost:8000"  # Change this to your API server URL
 FRONTEND_URL = "http://localhost:3000"  # This should match your FRONTEND_URL env var
 
-def main():
+# Endpoints checked before the interactive part of the test
+PROBE_PATHS = ("/api/health", "/oauth/microsoft/test")
+
+async def main():
+    # Every request in the test shares one pooled client
+    async with httpx.AsyncClient(base_url=BASE_URL, timeout=5) as client:
+        await run_tests(client)
+
+async def run_tests(client: httpx.AsyncClient):
+    # Total wait is the slower probe instead of the sum of both
+    health, microsoft = await asyncio.gather(
+        *(client.get(path) for path in PROBE_PATHS),
+        return_exceptions=True
+    )
+    
     print("=== OAuth Flow Test with is_new_user Flag ===")
     print(f"API Server: {BASE_URL}")
     print(f"Frontend: {FRONTEND_URL}")
     print("\n1. Testing OAuth endpoints...")
     
     # Test that the API server is running
-    try:
-        response = requests.get(f"{BASE_URL}/api/health", timeout=5)
-        if response.status_code == 200:
-            print("✅ API server is running")
-        else:
-            print(f"❌ API server returned status code {response.status_code}")
-            return
-    except requests.exceptions.ConnectionError:
+    if isinstance(health, httpx.TransportError):
         print(f"❌ Could not connect to API server at {BASE_URL}")
         print("Make sure your server is running and the URL is correct")
         return
+    if isinstance(health, Exception):
+        print(f"❌ Error checking API server: {str(health)}")
+        return
+    if health.status_code == 200:
+        print("✅ API server is running")
+    else:
+        print(f"❌ API server returned status code {health.status_code}")
+        return
     
     # Test Microsoft OAuth URL
     try:
         print("\n2. Testing Microsoft OAuth URL construction...")
-        response = requests.get(f"{BASE_URL}/oauth/microsoft/test", timeout=5)
-        if response.status_code == 200:
-            data = response.json()
+        if isinstance(microsoft, Exception):
+            raise microsoft
+        if microsoft.status_code == 200:
+            data = microsoft.json()
             print("✅ Microsoft OAuth configuration test passed")
             print(f"   Client ID available: {data.get('client_id_available', False)}")
             print(f"   Client Secret available: {data.get('client_secret_available', False)}")
             print(f"   Redirect URI: {data.get('redirect_uri', 'Not found')}")
         else:
-            print(f"❌ Microsoft OAuth test failed with status code {response.status_code}")
+            print(f"❌ Microsoft OAuth test failed with status code {microsoft.status_code}")
             return
     except Exception as e:
         print(f"❌ Error testing Microsoft OAuth URL: {str(e)}")
@@ -103,21 +119,21 @@ def main():
         print("provider would validate credentials and redirect to your callback URL.")
         
         # Wait 2 seconds to make it seem like we're doing something
-        time.sleep(2)
+        await asyncio.sleep(2)
         
         # Now check the session-test endpoint to verify it's working
         print("\nChecking session functionality...")
         try:
-            response = requests.get(f"{BASE_URL}/oauth/session-test")
-            if response.status_code == 200:
+            session_test = await client.get("/oauth/session-test")
+            if session_test.status_code == 200:
                 print("✅ Session test successful")
                 
                 # Show a partial result
-                session_data = response.json()
+                session_data = session_test.json()
                 print(f"   Session counter: {session_data.get('counter', 'Not found')}")
                 print(f"   Session cookie name: {session_data.get('session_cookie_name', 'Not found')}")
             else:
-                print(f"❌ Session test failed with status code {response.status_code}")
+                print(f"❌ Session test failed with status code {session_test.status_code}")
         except Exception as e:
             print(f"❌ Error testing session: {str(e)}")
         
@@ -142,4 +158,4 @@ def main():
     print("to provide the appropriate onboarding experience for new users.")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    asyncio.run(main()) 
\ No newline at end of file
@@ -32,32 +32,37 @@ recommended_vars = [
     "SESSION_SECRET_KEY"
 ]
 
+# Variables whose values are masked when printed
+SENSITIVE_MARKERS = ("SECRET", "KEY", "PASSWORD")
+sensitive_vars = frozenset(
+    var for var in critical_vars + recommended_vars
+    if any(marker in var for marker in SENSITIVE_MARKERS)
+)
+
+def display_value(var, value):
+    """Show first few characters only for sensitive info"""
+    if var in sensitive_vars:
+        return f"{value[:3]}...{value[-3:]}" if len(value) > 6 else "***"
+    return value
+
+env = os.environ
+
 print("Checking environment variables...")
 print("\nCritical variables:")
 missing_critical = []
 for var in critical_vars:
-    value = os.getenv(var)
+    value = env.get(var)
     if value:
-        # Show first few characters only for sensitive info
-        if "SECRET" in var or "KEY" in var or "PASSWORD" in var:
-            display_value = f"{value[:3]}...{value[-3:]}" if len(value) > 6 else "***"
-        else:
-            display_value = value
-        print(f"✅ {var}: {display_value}")
+        print(f"✅ {var}: {display_value(var, value)}")
     else:
         print(f"❌ {var}: MISSING")
         missing_critical.append(var)
 
 print("\nRecommended variables:")
 for var in recommended_vars:
-    value = os.getenv(var)
+    value = env.get(var)
     if value:
-        # Show first few characters only for sensitive info
-        if "SECRET" in var or "KEY" in var or "PASSWORD" in var:
-            display_value = f"{value[:3]}...{value[-3:]}" if len(value) > 6 else "***"
-        else:
-            display_value = value
-        print(f"✅ {var}: {display_value}")
+        print(f"✅ {var}: {display_value(var, value)}")
     else:
         print(f"⚠️ {var}: Not set")
 